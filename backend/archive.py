@@ -0,0 +1,133 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import zstandard
+
+from heuristic import analyze_document
+
+
+class HtmlArchive:
+    """zstd-compressed, content-addressed store of fetched html with a (url, fetched_at) index"""
+
+    def __init__(self, root: str = "html_archive", level: int = 10):
+        self.root = root
+        self.blob_root = os.path.join(root, "blobs")
+        os.makedirs(self.blob_root, exist_ok=True)
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL, fetched_at REAL NOT NULL, hash TEXT NOT NULL, encoding TEXT);
+            CREATE INDEX IF NOT EXISTS fetches_url_time ON fetches (url, fetched_at);
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY, raw_bytes INTEGER NOT NULL, stored_bytes INTEGER NOT NULL);
+        """)
+        self.db.commit()
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_root, digest[:2], digest[2:] + ".zst")
+
+    def put(self, url: str, body: bytes, encoding: str | None = None, fetched_at: float | None = None) -> str:
+        """store a fetched body once per distinct content and index this fetch of it"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            with self.lock:
+                compressed = self.compressor.compress(body)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(partial_path, "wb") as file:
+                file.write(compressed)
+            os.replace(partial_path, path)
+            with self.lock:
+                self.db.execute("INSERT OR IGNORE INTO blobs (hash, raw_bytes, stored_bytes) VALUES (?, ?, ?)",
+                                (digest, len(body), len(compressed)))
+        with self.lock:
+            self.db.execute("INSERT INTO fetches (url, fetched_at, hash, encoding) VALUES (?, ?, ?, ?)",
+                            (url, fetched_at or time.time(), digest, encoding))
+            self.db.commit()
+        return digest
+
+    def put_response(self, response) -> str:
+        return self.put(response.url, response.content, response.encoding)
+
+    def read(self, digest: str) -> bytes:
+        # map the blob instead of reading it so the page cache, not the heap, holds the compressed bytes
+        with open(self.blob_path(digest), "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return zstandard.ZstdDecompressor().decompress(mapped)
+
+    def read_text(self, digest: str, encoding: str | None = None) -> str:
+        return self.read(digest).decode(encoding or "utf-8", errors="replace")
+
+    def fetches(self, url: str | None = None, latest: bool = True, since: float | None = None):
+        """(url, fetched_at, hash, encoding) rows, only the newest fetch per url when latest is set"""
+        query = "SELECT url, MAX(fetched_at), hash, encoding FROM fetches" if latest \
+            else "SELECT url, fetched_at, hash, encoding FROM fetches"
+        conditions, params = [], []
+        if url:
+            conditions.append("url = ?")
+            params.append(url)
+        if since:
+            conditions.append("fetched_at >= ?")
+            params.append(since)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " GROUP BY url ORDER BY url" if latest else " ORDER BY url, fetched_at"
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        return rows
+
+    def stats(self) -> dict:
+        with self.lock:
+            fetches = self.db.execute("SELECT COUNT(*), COUNT(DISTINCT url) FROM fetches").fetchone()
+            blobs = self.db.execute("SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(stored_bytes), 0) "
+                                    "FROM blobs").fetchone()
+        return {
+            "fetches": fetches[0],
+            "urls": fetches[1],
+            "blobs": blobs[0],
+            "raw_bytes": blobs[1],
+            "stored_bytes": blobs[2]
+        }
+
+
+def rescore(archive: HtmlArchive, categories=None, url: str | None = None, latest: bool = True,
+            since: float | None = None):
+    """re-run the extractors over archived html without touching the network"""
+    for page_url, fetched_at, digest, encoding in archive.fetches(url, latest, since):
+        try:
+            result = analyze_document(archive.read_text(digest, encoding), categories)
+            yield {"url": page_url, "fetched_at": fetched_at, "hash": digest, "heuristics": result.to_dict()}
+        except Exception as error:
+            yield {"url": page_url, "fetched_at": fetched_at, "hash": digest, "error": str(error)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="archived html tools")
+    parser.add_argument("--archive", default=os.getenv("HTML_ARCHIVE_DIR") or "html_archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rescore_parser = commands.add_parser("rescore", help="re-run heuristics over archived pages as ndjson")
+    rescore_parser.add_argument("--url")
+    rescore_parser.add_argument("--all", action="store_true", help="every archived fetch, not just the latest per url")
+    rescore_parser.add_argument("--since", type=float, help="unix timestamp")
+    rescore_parser.add_argument("--categories", help="comma-separated score categories")
+    commands.add_parser("stats", help="archive size and dedup counts")
+    args = parser.parse_args()
+
+    archive = HtmlArchive(args.archive)
+    if args.command == "stats":
+        print(json.dumps(archive.stats()))
+    else:
+        categories = args.categories.split(",") if args.categories else None
+        for line in rescore(archive, categories, args.url, not args.all, args.since):
+            sys.stdout.write(json.dumps(line, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
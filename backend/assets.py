@@ -0,0 +1,197 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONTENT_RANGE_TOTAL = re.compile(r"/\s*(\d+)\s*$")
+MISSING = object()
+
+
+def collect_asset_urls(soup, base_url: str, limit: int = 200) -> list:
+    """absolute urls of the images, scripts and stylesheets a page references, as (url, kind)"""
+    found = OrderedDict()
+
+    def add(value, kind):
+        if not value or value.startswith(("data:", "javascript:", "#")):
+            return
+        url = urljoin(base_url, value.strip())
+        if urlparse(url).scheme in ("http", "https"):
+            found.setdefault(url, kind)
+
+    for image in soup.find_all("img"):
+        add(image.get("src") or image.get("data-src"), "image")
+    for script in soup.find_all("script", src=True):
+        add(script["src"], "script")
+    for link in soup.find_all("link", href=True):
+        if "stylesheet" in [rel.lower() for rel in link.get("rel") or []]:
+            add(link["href"], "stylesheet")
+    return list(found.items())[:limit]
+
+
+class AssetSizeCache:
+    """lru cache of asset sizes; unknown sizes are cached too so they are not re-probed"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str):
+        with self.lock:
+            size = self.entries.get(url, MISSING)
+            if size is MISSING:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(url)
+                self.hits += 1
+            return size
+
+    def put(self, url: str, size: int | None):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[url] = size
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class AssetProber:
+    """pooled, concurrent HEAD/range probes with per-host limits and a deadline per page.
+    urls wait in a per-host queue shared by every page, drained by at most per_host lanes per host,
+    so one host holds at most per_host pool workers; lanes of different hosts still queue once they outnumber workers"""
+
+    def __init__(self, workers: int = 16, per_host: int = 4, deadline: float = 3.0, timeout: float = 2.0,
+                 cache: AssetSizeCache | None = None):
+        self.per_host = per_host
+        self.deadline = deadline
+        self.timeout = timeout
+        self.cache = cache or AssetSizeCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-probe")
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "Mozilla/5.0"
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.host_queues = {}
+        self.host_lanes = {}
+        self.lock = threading.Lock()
+        self.probed = 0
+        self.timed_out = 0
+
+    def _request_size(self, url: str, timeout: float) -> int | None:
+        response = self.session.head(url, timeout=timeout, allow_redirects=True)
+        if response.ok and response.headers.get("Content-Length"):
+            return int(response.headers["Content-Length"])
+        # no length on HEAD (or HEAD refused): ask for one byte and read the total from Content-Range
+        with self.session.get(url, timeout=timeout, headers={"Range": "bytes=0-0"}, stream=True) as response:
+            if response.status_code == 206:
+                match = CONTENT_RANGE_TOTAL.search(response.headers.get("Content-Range", ""))
+                return int(match.group(1)) if match else None
+            if response.ok and response.headers.get("Content-Length"):
+                return int(response.headers["Content-Length"])
+        return None
+
+    def _probe(self, url: str, expires: float) -> int | None:
+        try:
+            size = self._request_size(url, min(self.timeout, expires - time.monotonic()))
+        except (requests.RequestException, ValueError):
+            # a timeout may only mean the deadline was short, so leave it out of the cache
+            return None
+        with self.lock:
+            self.probed += 1
+        self.cache.put(url, size)
+        return size
+
+    def _run_lane(self, host: str):
+        # a lane drains its host's queue, whichever page queued the url, and retires when it is empty
+        while True:
+            with self.lock:
+                queue = self.host_queues[host]
+                if not queue:
+                    self.host_lanes[host] -= 1
+                    return
+                url, expires, page = queue.popleft()
+            if time.monotonic() < expires:
+                page["found"][url] = self._probe(url, expires)
+            with self.lock:
+                page["remaining"] -= 1
+                if not page["remaining"]:
+                    page["done"].set()
+
+    def sizes(self, urls: list) -> dict:
+        """url -> size in bytes (None when unknown or not probed before the deadline)"""
+        expires = time.monotonic() + self.deadline
+        sizes = {}
+        by_host = {}
+        for url in urls:
+            size = self.cache.get(url)
+            if size is MISSING:
+                by_host.setdefault(urlparse(url).netloc, []).append(url)
+            else:
+                sizes[url] = size
+        if not by_host:
+            return sizes
+
+        page = {"found": {}, "remaining": sum(len(host_urls) for host_urls in by_host.values()),
+                "done": threading.Event()}
+        for host, host_urls in by_host.items():
+            with self.lock:
+                queue = self.host_queues.setdefault(host, deque())
+                queue.extend((url, expires, page) for url in host_urls)
+                running = self.host_lanes.get(host, 0)
+                new_lanes = max(0, min(self.per_host - running, len(queue)))
+                self.host_lanes[host] = running + new_lanes
+            for _ in range(new_lanes):
+                self.executor.submit(self._run_lane, host)
+        # urls still queued at the deadline are skipped when a lane reaches them
+        page["done"].wait(max(0, expires - time.monotonic()))
+
+        found = dict(page["found"])
+        for host_urls in by_host.values():
+            for url in host_urls:
+                if url not in found:
+                    self.timed_out += 1
+                sizes[url] = found.get(url)
+        return sizes
+
+    def stats(self) -> dict:
+        return {
+            "probed": self.probed,
+            "timed_out": self.timed_out,
+            "hosts": len(self.host_queues),
+            "cache": self.cache.stats()
+        }
+
+
+def probe_page_weight(soup, url: str, prober: AssetProber, result) -> dict:
+    """total page weight (html plus referenced assets) and the largest assets"""
+    assets = collect_asset_urls(soup, url)
+    sizes = prober.sizes([asset_url for asset_url, _ in assets])
+    sized = [{"url": asset_url, "kind": kind, "bytes": sizes[asset_url]}
+             for asset_url, kind in assets if sizes.get(asset_url) is not None]
+    asset_bytes = sum(asset["bytes"] for asset in sized)
+    return {
+        "page_weight_bytes": result.html_bytes + asset_bytes,
+        "asset_bytes": asset_bytes,
+        "assets_probed": len(sized),
+        "assets_unsized": len(assets) - len(sized),
+        "largest_assets": sorted(sized, key=lambda asset: asset["bytes"], reverse=True)[:5]
+    }
@@ -0,0 +1,109 @@
+# offline bulk audits: python -m cli [--input FILE] < targets.txt > results.ndjson
+# extractors, bs4 and requests are imported on first use, and nothing from the api server is loaded
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+def is_url(target: str) -> bool:
+    return target.startswith(("http://", "https://"))
+
+
+def audit(target: str, categories=None, quick: bool = False, archive_dir: str | None = None) -> dict:
+    """audit one url or local html file, returning the heuristics dict"""
+    if not is_url(target):
+        with open(target, encoding="utf-8", errors="replace") as file:
+            html = file.read()
+        if quick:
+            from prescan import quick_audit_document
+            return quick_audit_document(html)
+        from heuristic import analyze_document
+        return analyze_document(html, categories).to_dict()
+    if quick:
+        from prescan import quick_audit
+        return quick_audit(target)
+    from heuristic import run_heuristics
+    return run_heuristics(target, categories, archive=open_archive(archive_dir))
+
+
+_archives = {}
+
+
+def open_archive(archive_dir: str | None):
+    if not archive_dir:
+        return None
+    if archive_dir not in _archives:
+        from archive import HtmlArchive
+        _archives[archive_dir] = HtmlArchive(archive_dir)
+    return _archives[archive_dir]
+
+
+def audit_line(target: str, categories=None, quick: bool = False, archive_dir: str | None = None) -> dict:
+    started = time.perf_counter()
+    try:
+        result = {"input": target, "heuristics": audit(target, categories, quick, archive_dir)}
+    except Exception as error:
+        result = {"input": target, "error": str(error)}
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def audit_many(targets, workers: int = 8, processes: bool = False, **options):
+    """yield results as they finish, keeping at most a few batches of inputs in flight"""
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    window = workers * 4
+    with executor_class(max_workers=workers) as executor:
+        pending = set()
+        for target in targets:
+            pending.add(executor.submit(audit_line, target, **options))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def read_targets(stream):
+    for line in stream:
+        target = line.strip()
+        if target and not target.startswith("#"):
+            yield target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli", description="audit urls or local html files, one per line, as ndjson")
+    parser.add_argument("--input", "-i", help="file with one url or html path per line (default: stdin)")
+    parser.add_argument("--workers", "-w", type=int, default=8)
+    parser.add_argument("--processes", action="store_true",
+                        help="use worker processes instead of threads; faster for large local html corpora")
+    parser.add_argument("--categories", help="comma-separated score categories")
+    parser.add_argument("--quick", action="store_true", help="streaming prescan only; scores technical_performance")
+    parser.add_argument("--archive", default=os.getenv("HTML_ARCHIVE_DIR"), help="archive fetched html in this directory")
+    args = parser.parse_args(argv)
+
+    stream = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    options = {
+        "categories": args.categories.split(",") if args.categories else None,
+        "quick": args.quick,
+        "archive_dir": args.archive
+    }
+    failures = 0
+    try:
+        for result in audit_many(read_targets(stream), args.workers, args.processes, **options):
+            failures += "error" in result
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+from llm import compact_signals
+
+
+def score_deltas(baseline_scores: dict, scores: dict) -> dict:
+    """per-category score difference of a page against the baseline (positive = page is ahead)"""
+    return {category: round(score - baseline_scores[category], 1)
+            for category, score in scores.items() if category in baseline_scores}
+
+
+def signal_diff(baseline_signals: dict, signals: dict) -> dict:
+    """compact signals that differ from the baseline, as [baseline, page]"""
+    return {name: [baseline_signals.get(name), value]
+            for name, value in signals.items()
+            if name != "conversion_scores" and baseline_signals.get(name) != value}
+
+
+def build_comparison(results: list) -> dict:
+    """compare every page with the first one; results are {"url", "heuristics"} or {"url", "error"}"""
+    baseline = results[0]
+    baseline_scores = baseline["heuristics"]["conversion_scores"]
+    baseline_signals = compact_signals(baseline["heuristics"])
+
+    competitors = []
+    for result in results[1:]:
+        if "error" in result:
+            competitors.append({"url": result["url"], "error": result["error"]})
+            continue
+        scores = result["heuristics"]["conversion_scores"]
+        competitors.append({
+            "url": result["url"],
+            "conversion_scores": scores,
+            "deltas": score_deltas(baseline_scores, scores),
+            "signal_diff": signal_diff(baseline_signals, compact_signals(result["heuristics"]))
+        })
+
+    scored = [baseline] + [result for result in results[1:] if "error" not in result]
+    leaders = {category: max(scored, key=lambda result: result["heuristics"]["conversion_scores"][category])["url"]
+               for category in baseline_scores}
+    return {
+        "baseline": {"url": baseline["url"], "conversion_scores": baseline_scores,
+                     "signals": {name: value for name, value in baseline_signals.items() if name != "conversion_scores"}},
+        "competitors": competitors,
+        "leaders": leaders
+    }
@@ -0,0 +1,277 @@
+import gzip
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, urljoin
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+USER_AGENT = "Mozilla/5.0"
+
+PRODUCT_URL_PATTERNS = [
+    r'/products?/[^/]+', r'/p/[^/]+', r'/items?/[^/]+', r'/dp/[A-Z0-9]{10}', r'/shop/[^/]+/[^/]+',
+    r'-p-\d+', r'/pd/[^/]+'
+]
+NON_PRODUCT_URL_PATTERNS = [
+    r'/blogs?/', r'/pages/', r'/news/', r'/cart', r'/account', r'/search', r'/login', r'/tags?/',
+    r'/policies/', r'\.(?:jpg|jpeg|png|gif|webp|svg|pdf)$'
+]
+NON_PRODUCT_SITEMAP_WORDS = ["blog", "pages", "article", "news", "post", "image", "video"]
+TRACKING_PARAMS = ["gclid", "fbclid", "msclkid", "ref", "_pos", "_sid", "_ss"]
+
+
+def normalize_url(url: str) -> str:
+    """normalize url for dedupe: lowercase host, drop fragment and tracking params"""
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or "https").lower()
+    netloc = parsed.netloc.lower()
+    if (scheme == "https" and netloc.endswith(":443")) or (scheme == "http" and netloc.endswith(":80")):
+        netloc = netloc.rsplit(":", 1)[0]
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query_params = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                    if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS]
+    query = urlencode(sorted(query_params))
+    return urlunparse((scheme, netloc, path, "", query, ""))
+
+
+def normalize_domain(domain: str) -> str:
+    """reduce a domain or url to its lowercase host"""
+    return (urlparse(domain).netloc or domain).lower().strip("/")
+
+
+def is_product_url(url: str) -> bool:
+    """guess whether a sitemap url points at a product page"""
+    path = urlparse(url).path
+    if any(re.search(pattern, path, re.I) for pattern in NON_PRODUCT_URL_PATTERNS):
+        return False
+    return any(re.search(pattern, path) for pattern in PRODUCT_URL_PATTERNS)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _PrefixedStream:
+    """file-like view of a raw response that can look at its first bytes without consuming them"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.prefix = b""
+
+    def peek(self, size: int) -> bytes:
+        while len(self.prefix) < size:
+            chunk = self.raw.read(size - len(self.prefix))
+            if not chunk:
+                break
+            self.prefix += chunk
+        return self.prefix[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self.prefix:
+            head, self.prefix = (self.prefix, b"") if size < 0 or size >= len(self.prefix) \
+                else (self.prefix[:size], self.prefix[size:])
+            if size < 0:
+                return head + self.raw.read()
+            return head
+        return self.raw.read() if size < 0 else self.raw.read(size)
+
+
+def iter_sitemap(sitemap_url: str, session=None, timeout: int = 15):
+    """stream a sitemap or sitemap index, yielding (loc, is_index) without loading it into memory"""
+    http = session or requests
+    response = http.get(sitemap_url, stream=True, timeout=timeout, headers={"User-Agent": USER_AGENT})
+    response.raise_for_status()
+    response.raw.decode_content = True
+    stream = _PrefixedStream(response.raw)
+    if stream.peek(2) == b"\x1f\x8b":
+        stream = gzip.GzipFile(fileobj=stream)
+
+    root = None
+    is_index = False
+    try:
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            name = _local_name(element.tag)
+            if event == "start":
+                if root is None:
+                    root = element
+                    is_index = name == "sitemapindex"
+                continue
+            if name in ("url", "sitemap"):
+                loc = next((child.text for child in element if _local_name(child.tag) == "loc"), None)
+                if loc and loc.strip():
+                    yield loc.strip(), is_index
+                root.clear()
+    finally:
+        response.close()
+
+
+class Politeness:
+    """per-domain request spacing, honoring robots.txt crawl-delay"""
+
+    def __init__(self, min_delay: float = 1.0):
+        self.min_delay = min_delay
+        self.delays = {}
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def set_delay(self, domain: str, delay: float | None):
+        with self.lock:
+            self.delays[domain] = max(self.min_delay, delay or 0)
+
+    def wait(self, domain: str):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(domain, 0))
+            self.next_allowed[domain] = slot + self.delays.get(domain, self.min_delay)
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Frontier:
+    """sqlite-backed crawl frontier that survives restarts"""
+
+    def __init__(self, path: str = "crawl_frontier.db"):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS sitemaps (
+                url TEXT PRIMARY KEY, domain TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending');
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY, domain TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending',
+                discovered_at REAL, finished_at REAL, error TEXT);
+            CREATE INDEX IF NOT EXISTS urls_domain_status ON urls (domain, status);
+        """)
+        # anything claimed by a crawl that died mid-run goes back to the queue
+        self.db.execute("UPDATE urls SET status = 'pending' WHERE status = 'in_progress'")
+        self.db.commit()
+
+    def has_sitemaps(self, domain: str) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM sitemaps WHERE domain = ? LIMIT 1", (domain,)).fetchone() is not None
+
+    def add_sitemap(self, domain: str, url: str):
+        with self.lock:
+            self.db.execute("INSERT OR IGNORE INTO sitemaps (url, domain) VALUES (?, ?)", (url, domain))
+            self.db.commit()
+
+    def next_sitemap(self, domain: str) -> str | None:
+        with self.lock:
+            row = self.db.execute("SELECT url FROM sitemaps WHERE domain = ? AND status = 'pending' LIMIT 1",
+                                  (domain,)).fetchone()
+            return row[0] if row else None
+
+    def finish_sitemap(self, url: str, status: str = "done"):
+        with self.lock:
+            self.db.execute("UPDATE sitemaps SET status = ? WHERE url = ?", (status, url))
+            self.db.commit()
+
+    def add_urls(self, domain: str, urls) -> int:
+        with self.lock:
+            before = self.db.total_changes
+            self.db.executemany("INSERT OR IGNORE INTO urls (url, domain, discovered_at) VALUES (?, ?, ?)",
+                                [(url, domain, time.time()) for url in urls])
+            self.db.commit()
+            return self.db.total_changes - before
+
+    def claim(self, domain: str) -> str | None:
+        with self.lock:
+            row = self.db.execute("SELECT url FROM urls WHERE domain = ? AND status = 'pending' ORDER BY rowid LIMIT 1",
+                                  (domain,)).fetchone()
+            if not row:
+                return None
+            self.db.execute("UPDATE urls SET status = 'in_progress' WHERE url = ?", (row[0],))
+            self.db.commit()
+            return row[0]
+
+    def finish(self, url: str, error: str | None = None):
+        with self.lock:
+            self.db.execute("UPDATE urls SET status = ?, finished_at = ?, error = ? WHERE url = ?",
+                            ("failed" if error else "done", time.time(), error, url))
+            self.db.commit()
+
+    def counts(self, domain: str) -> dict:
+        with self.lock:
+            rows = self.db.execute("SELECT status, COUNT(*) FROM urls WHERE domain = ? GROUP BY status", (domain,))
+            return dict(rows.fetchall())
+
+
+def load_robots(base_url: str, session=None, timeout: int = 10) -> RobotFileParser:
+    """fetch and parse robots.txt, treating a missing file as allow-all"""
+    robots = RobotFileParser(urljoin(base_url, "/robots.txt"))
+    try:
+        response = (session or requests).get(robots.url, timeout=timeout, headers={"User-Agent": USER_AGENT})
+        robots.parse(response.text.splitlines() if response.ok else [])
+    except requests.RequestException:
+        robots.parse([])
+    return robots
+
+
+def discover_product_urls(domain: str, frontier: Frontier, politeness: Politeness, session=None, robots=None,
+                          base_url: str | None = None) -> int:
+    """walk pending sitemaps for a domain and queue product urls in the frontier"""
+    base_url = base_url or f"https://{domain}"
+    if not frontier.has_sitemaps(domain):
+        sitemap_urls = (robots.site_maps() if robots else None) or [urljoin(base_url, "/sitemap.xml")]
+        for sitemap_url in sitemap_urls:
+            frontier.add_sitemap(domain, sitemap_url)
+
+    queued = 0
+    while True:
+        sitemap_url = frontier.next_sitemap(domain)
+        if not sitemap_url:
+            break
+        politeness.wait(domain)
+        batch = []
+        try:
+            for loc, is_index in iter_sitemap(sitemap_url, session):
+                if is_index:
+                    child_name = urlparse(loc).path.lower()
+                    if not any(word in child_name for word in NON_PRODUCT_SITEMAP_WORDS):
+                        frontier.add_sitemap(domain, loc)
+                    continue
+                if urlparse(loc).netloc.lower() not in (domain, f"www.{domain}", domain.removeprefix("www.")):
+                    continue
+                if is_product_url(loc) and (robots is None or robots.can_fetch(USER_AGENT, loc)):
+                    batch.append(normalize_url(loc))
+                if len(batch) >= 500:
+                    queued += frontier.add_urls(domain, batch)
+                    batch = []
+            queued += frontier.add_urls(domain, batch)
+            frontier.finish_sitemap(sitemap_url)
+        except (requests.RequestException, ET.ParseError, OSError, EOFError, ValueError):
+            queued += frontier.add_urls(domain, batch)
+            frontier.finish_sitemap(sitemap_url, "failed")
+    return queued
+
+
+def crawl_domain(domain: str, audit, frontier: Frontier, politeness: Politeness | None = None, max_pages: int = 50):
+    """discover product urls from a domain's sitemaps and yield audit results, resuming from the frontier"""
+    # a bare domain is crawled over https; an explicit scheme (e.g. a local http server) is kept
+    scheme = urlparse(domain).scheme or "https"
+    domain = normalize_domain(domain)
+    base_url = f"{scheme}://{domain}"
+    politeness = politeness or Politeness()
+    session = requests.Session()
+    robots = load_robots(base_url, session)
+    politeness.set_delay(domain, robots.crawl_delay(USER_AGENT))
+
+    discover_product_urls(domain, frontier, politeness, session, robots, base_url)
+
+    for _ in range(max_pages):
+        url = frontier.claim(domain)
+        if not url:
+            break
+        politeness.wait(domain)
+        try:
+            result = audit(url)
+        except Exception as error:
+            frontier.finish(url, str(error))
+            yield {"url": url, "error": str(error)}
+            continue
+        frontier.finish(url)
+        yield {"url": url, "heuristics": result}
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+
+USER_AGENT = "Mozilla/5.0"
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HostLatency:
+    """rolling window of one host's response times (time to headers, in seconds)"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def percentiles(self) -> dict:
+        if not self.samples:
+            return {"p50": None, "p95": None, "p99": None}
+        return {name: round(percentile(self.samples, fraction), 3)
+                for name, fraction in [("p50", 0.5), ("p95", 0.95), ("p99", 0.99)]}
+
+
+class Fetcher:
+    """page fetches with per-host adaptive timeouts and an optional hedged second request.
+    latency samples are time to headers: every request streams and the caller reads the body"""
+
+    def __init__(self, default_timeout: float = 12, min_timeout: float = 2, connect_timeout: float = 3.05,
+                 min_samples: int = 10, hedge: bool = False, hedge_ratio: float = 0.1, workers: int = 8):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.connect_timeout = connect_timeout
+        self.min_samples = min_samples
+        self.hedge = hedge
+        self.hedge_ratio = hedge_ratio
+        self.hosts = {}
+        self.lock = threading.Lock()
+        # primaries of hedge-eligible fetches run on a bounded pool; with every slot taken the caller fetches itself
+        self.primaries = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") if hedge else None
+        self.primary_slots = threading.BoundedSemaphore(workers)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch-hedge") if hedge else None
+
+    def host(self, url: str) -> HostLatency:
+        name = urlparse(url).netloc.lower()
+        with self.lock:
+            if name not in self.hosts:
+                self.hosts[name] = HostLatency()
+            return self.hosts[name]
+
+    def timeouts(self, url: str) -> tuple:
+        """(connect, read) deadlines: the fixed defaults until the host has history, then a multiple of its p99"""
+        latency = self.host(url)
+        if len(latency.samples) < self.min_samples:
+            return self.connect_timeout, self.default_timeout
+        p50, p99 = percentile(latency.samples, 0.5), percentile(latency.samples, 0.99)
+        connect = min(self.connect_timeout, max(1.0, 2 * p50))
+        read = min(self.default_timeout, max(self.min_timeout, 3 * p99))
+        return connect, read
+
+    def record(self, url: str, seconds: float | None, error: bool = False):
+        """add a sample, or count an error when seconds is None or error is set"""
+        latency = self.host(url)
+        with self.lock:
+            latency.requests += 1
+            if seconds is None or error:
+                latency.errors += 1
+            if seconds is not None:
+                latency.samples.append(seconds)
+
+    def record_failure(self, url: str, failure: Exception, started: float):
+        # a timeout is also a sample at the time waited, so a host that slowed down earns its deadline back
+        self.record(url, time.perf_counter() - started if isinstance(failure, requests.Timeout) else None, error=True)
+
+    def _get(self, url: str) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, timeout=self.timeouts(url), headers={"User-Agent": USER_AGENT}, stream=True)
+        except requests.RequestException as failure:
+            self.record_failure(url, failure, started)
+            raise
+        self.record(url, time.perf_counter() - started)
+        return response
+
+    def _hedge_after(self, latency: HostLatency) -> float | None:
+        """seconds to wait before hedging, or None when the host has no history or the hedge budget is spent"""
+        if not self.hedge or len(latency.samples) < self.min_samples:
+            return None
+        if latency.hedged >= self.hedge_ratio * max(latency.requests, 1):
+            return None
+        return percentile(latency.samples, 0.95)
+
+    def fetch(self, url: str) -> requests.Response:
+        """fetch a page, raising on http errors"""
+        latency = self.host(url)
+        hedge_after = self._hedge_after(latency)
+        if hedge_after is None or not self.primary_slots.acquire(blocking=False):
+            response = self._get(url)
+            response.raise_for_status()
+            return response
+
+        # both legs return at the headers; only the winner's body is downloaded
+        primary = self.primaries.submit(self._get, url)
+        primary.add_done_callback(lambda _: self.primary_slots.release())
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            response = primary.result()
+            response.raise_for_status()
+            return response
+
+        # the first request is past this host's p95, so race a second one on the pool and keep whichever answers first
+        with self.lock:
+            latency.hedged += 1
+        hedged = self.executor.submit(self._get, url)
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.RequestException as failure:
+                    error = failure
+                    continue
+                if future is hedged:
+                    with self.lock:
+                        latency.hedge_wins += 1
+                for loser in pending:
+                    loser.add_done_callback(close_response)
+                response.raise_for_status()
+                return response
+        raise error
+
+    def stats(self) -> dict:
+        with self.lock:
+            hosts = dict(self.hosts)
+        return {
+            name: {
+                **latency.percentiles(),
+                "requests": latency.requests,
+                "errors": latency.errors,
+                "hedged": latency.hedged,
+                "hedge_wins": latency.hedge_wins,
+                "timeouts": [round(value, 2) for value in self.timeouts("//" + name)]
+            }
+            for name, latency in hosts.items()
+        }
+
+
+def close_response(future: Future):
+    # the losing leg of a hedge stops at its headers; closing drops the connection instead of reading the body
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+default_fetcher = Fetcher()
+
+
+def fetch_page(url: str, fetcher: Fetcher | None = None) -> requests.Response:
+    """fetch a page through the shared per-host latency tracker"""
+    return (fetcher or default_fetcher).fetch(url)
@@ -1,9 +1,16 @@
-import requests
 import re
 import json
-from bs4 import BeautifulSoup
+import logging
+from functools import partial
+from bs4 import BeautifulSoup, NavigableString, CData
 
-def summarize_structure(soup) -> dict:
+from models import HeuristicsResult
+from assets import probe_page_weight
+from fetch import fetch_page
+
+logger = logging.getLogger(__name__)
+
+def summarize_structure(soup, cta=None) -> dict:
     """analyze DOM structure and return structural traits"""
     heading_hierarchy = []
     for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
@@ -30,40 +37,19 @@ def summarize_structure(soup) -> dict:
     section_count = len(soup.find_all('section'))
     main_present = bool(soup.find('main'))
     
+    cta = cta or locate_cta(soup)
+    cta_node = cta["node"]
+    
     cta_grouping = False
-    cta_texts = ["add to cart", "add to bag", "buy now", "buy", "checkout", "order now", "shop now",
-                 "get started", "start now", "get started now", "try now", "try free", "sign up", "signup",
-                 "contact sales", "talk to sales", "schedule demo", "book demo", "request demo", "learn more",
-                 "download", "subscribe", "join now", "register", "create account", "free trial"]
-    cta_node = None
-    
-    for cta_text in cta_texts:
-        button_elements = soup.find_all(["button", "a", "input"])
-        for button_element in button_elements:
-            button_text = (button_element.get("value") or button_element.get("aria-label") or button_element.get_text(strip=True)).lower()
-            if cta_text in button_text:
-                cta_node = button_element
-                break
-        if cta_node:
-            break
+    if cta_node is not None and cta_node.parent:
+        parent_text = cta_node.parent.get_text(strip=True).lower()
+        price_pattern = r'[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?'
+        has_price = bool(re.search(price_pattern, parent_text))
+        product_keywords = ["chocolate", "truffle", "box", "assorted", "product", "item"]
+        has_title = any(keyword in parent_text for keyword in product_keywords)
+        cta_grouping = has_price or has_title
     
-    if cta_node:
-        cta_parent = cta_node.parent
-        if cta_parent:
-            parent_text = cta_parent.get_text(strip=True).lower()
-            price_pattern = r'[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?'
-            has_price = bool(re.search(price_pattern, parent_text))
-            product_keywords = ["chocolate", "truffle", "box", "assorted", "product", "item"]
-            has_title = any(keyword in parent_text for keyword in product_keywords)
-            cta_grouping = has_price or has_title
-    
-    cta_position = None
-    if cta_node:
-        all_interactive = soup.find_all(["button", "a", "input"])
-        try:
-            cta_position = all_interactive.index(cta_node)
-        except ValueError:
-            cta_position = None
+    cta_position = cta["position"]
     
     gallery_present = False
     img_containers = {}
@@ -86,7 +72,7 @@ def summarize_structure(soup) -> dict:
         modals = soup.select(selector)
         for modal in modals:
             modal_text = modal.get_text(strip=True).lower()
-            if any(cta_text in modal_text for cta_text in cta_texts):
+            if any(phrase in modal_text for phrase in CTA_PHRASES):
                 modals_with_cta = True
                 break
         if modals_with_cta:
@@ -105,65 +91,45 @@ def summarize_structure(soup) -> dict:
         "modals_with_cta": modals_with_cta
     }
 
-def detect_site_type(soup) -> str:
-    """detect site type for appropriate heuristics"""
-    page_text = soup.get_text().lower()
-    
-    ecommerce_keywords = ["add to cart", "shopping cart", "checkout", "buy now", "add to bag", 
-                         "in stock", "out of stock", "quantity", "shipping", "delivery"]
-    ecommerce_score = sum(1 for keyword in ecommerce_keywords if keyword in page_text)
-    
-    saas_keywords = ["get started", "free trial", "sign up", "login", "dashboard", "pricing", 
-                    "per month", "per year", "subscription", "api", "integration"]
-    saas_score = sum(1 for keyword in saas_keywords if keyword in page_text)
-    
-    b2b_keywords = ["enterprise", "contact sales", "schedule demo", "request quote", "solutions",
-                   "partners", "case study", "whitepaper", "roi", "implementation"]
-    b2b_score = sum(1 for keyword in b2b_keywords if keyword in page_text)
-    
-    service_keywords = ["book now", "appointment", "consultation", "quote", "estimate", 
-                       "contact us", "call now", "schedule", "service"]
-    service_score = sum(1 for keyword in service_keywords if keyword in page_text)
-    
-    scores = {
-        "ecommerce": ecommerce_score,
-        "saas": saas_score, 
-        "b2b": b2b_score,
-        "service": service_score
-    }
-    
-    return max(scores, key=scores.get) if max(scores.values()) > 0 else "generic"
+SITE_TYPE_KEYWORDS = {
+    "ecommerce": ["add to cart", "shopping cart", "checkout", "buy now", "add to bag",
+                  "in stock", "out of stock", "quantity", "shipping", "delivery"],
+    "saas": ["get started", "free trial", "sign up", "login", "dashboard", "pricing",
+             "per month", "per year", "subscription", "api", "integration"],
+    "b2b": ["enterprise", "contact sales", "schedule demo", "request quote", "solutions",
+            "partners", "case study", "whitepaper", "roi", "implementation"],
+    "service": ["book now", "appointment", "consultation", "quote", "estimate",
+                "contact us", "call now", "schedule", "service"]
+}
 
-def detect_page_type(soup) -> str:
-    """detect homepage, product page, or other page type"""
-    page_text = soup.get_text().lower()
-    url = ""
-    
-    product_indicators = [
+PAGE_TYPE_INDICATORS = {
+    "product": [
         "add to cart", "buy now", "add to bag", "quantity", "size", "color", "variant",
         "product details", "specifications", "reviews", "rating", "price", "sale",
         "in stock", "out of stock", "shipping", "delivery", "returns", "warranty"
-    ]
-    product_score = sum(1 for indicator in product_indicators if indicator in page_text)
-    
-    homepage_indicators = [
+    ],
+    "homepage": [
         "welcome", "about us", "our story", "company", "team", "mission", "vision",
         "news", "blog", "press", "careers", "contact", "support", "help",
         "featured", "bestsellers", "new arrivals", "categories", "collections"
-    ]
-    homepage_score = sum(1 for indicator in homepage_indicators if indicator in page_text)
-    
-    category_indicators = [
+    ],
+    "category": [
         "filter", "sort", "results", "showing", "items", "products", "category",
         "brand", "price range", "clear filters", "refine", "view all"
     ]
-    category_score = sum(1 for indicator in category_indicators if indicator in page_text)
-    
-    scores = {
-        "product": product_score,
-        "homepage": homepage_score,
-        "category": category_score
-    }
+}
+
+def classify_site_type(found_keywords) -> str:
+    """pick the site type with the most keyword hits"""
+    scores = {site_type: sum(1 for keyword in keywords if keyword in found_keywords)
+              for site_type, keywords in SITE_TYPE_KEYWORDS.items()}
+    return max(scores, key=scores.get) if max(scores.values()) > 0 else "generic"
+
+def classify_page_type(found_keywords) -> str:
+    """pick the page type from indicator hits"""
+    scores = {page_type: sum(1 for indicator in indicators if indicator in found_keywords)
+              for page_type, indicators in PAGE_TYPE_INDICATORS.items()}
+    product_score, homepage_score, category_score = scores["product"], scores["homepage"], scores["category"]
     
     if max(scores.values()) > 0:
         page_type = max(scores, key=scores.get)
@@ -178,6 +144,16 @@ def detect_page_type(soup) -> str:
     
     return "unknown"
 
+def detect_site_type(soup, page_text=None) -> str:
+    """detect site type for appropriate heuristics"""
+    page_text = page_text if page_text is not None else soup.get_text().lower()
+    return classify_site_type(page_text)
+
+def detect_page_type(soup, page_text=None) -> str:
+    """detect homepage, product page, or other page type"""
+    page_text = page_text if page_text is not None else soup.get_text().lower()
+    return classify_page_type(page_text)
+
 def get_dynamic_keywords(site_type: str) -> dict:
     """get keywords based on site type"""
     keyword_sets = {
@@ -209,7 +185,234 @@ def get_dynamic_keywords(site_type: str) -> dict:
     }
     return keyword_sets.get(site_type, keyword_sets["generic"])
 
-def extract_basic_info(soup, keywords) -> dict:
+CURRENCY_SYMBOLS = {"USD": "$", "CAD": "$", "AUD": "$", "GBP": "£", "EUR": "€", "JPY": "¥", "INR": "₹"}
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _schema_types(obj: dict) -> list:
+    return [str(t).rsplit("/", 1)[-1] for t in _as_list(obj.get("@type"))]
+
+def _parse_price(value) -> float | None:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^\d.,]", "", str(value))
+    # whichever separator comes last is the decimal one: "1,234.56" and "1.234,56" are the same price
+    if "," in cleaned and "." in cleaned:
+        decimal = "," if cleaned.rfind(",") > cleaned.rfind(".") else "."
+    elif "," in cleaned:
+        decimal = "," if re.search(r",\d{1,2}$", cleaned) else None
+    else:
+        decimal = "." if cleaned.count(".") == 1 else None
+    if decimal is None:
+        cleaned = cleaned.replace(",", "").replace(".", "")
+    else:
+        cleaned = cleaned.replace("." if decimal == "," else ",", "").replace(decimal, ".")
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+def _image_urls(value) -> list:
+    urls = []
+    for item in _as_list(value):
+        if isinstance(item, str):
+            urls.append(item)
+        elif isinstance(item, dict):
+            src = item.get("url") or item.get("src") or item.get("contentUrl")
+            if isinstance(src, str):
+                urls.append(src)
+    return urls
+
+def _merge_product(found: dict, source: str, **fields):
+    added = False
+    for key, value in fields.items():
+        if value in (None, "", []):
+            continue
+        if found.get(key) in (None, "", []):
+            found[key] = value
+            added = True
+    if added and source not in found["sources"]:
+        found["sources"].append(source)
+
+def _walk_jsonld(node, found: dict, depth: int = 0):
+    if depth > 6:
+        return
+    if isinstance(node, list):
+        for item in node:
+            _walk_jsonld(item, found, depth + 1)
+        return
+    if not isinstance(node, dict):
+        return
+    if "@graph" in node:
+        _walk_jsonld(node["@graph"], found, depth + 1)
+
+    rating = node.get("aggregateRating")
+    if isinstance(rating, dict) and "ratingValue" in rating:
+        _merge_product(found, "json-ld", rating=_parse_price(rating.get("ratingValue")),
+                       review_count=int(_parse_price(rating.get("reviewCount") or rating.get("ratingCount")) or 0) or None)
+
+    types = _schema_types(node)
+    if any(t in ["Product", "Service", "Organization", "LocalBusiness"] for t in types):
+        reviews = node.get("review")
+        if isinstance(reviews, list):
+            found["review_items"] = max(found.get("review_items") or 0, len(reviews))
+
+    if any(t in ["Product", "ProductGroup", "IndividualProduct"] for t in types):
+        offers = [offer for offer in _as_list(node.get("offers")) if isinstance(offer, dict)]
+        if not offers and isinstance(node.get("hasVariant"), list):
+            offers = [offer for variant in node["hasVariant"] if isinstance(variant, dict)
+                      for offer in _as_list(variant.get("offers")) if isinstance(offer, dict)]
+        offer = offers[0] if offers else {}
+        price = _parse_price(offer.get("price", offer.get("lowPrice")))
+        if price is None and isinstance(offer.get("priceSpecification"), dict):
+            price = _parse_price(offer["priceSpecification"].get("price"))
+        availability = offer.get("availability")
+        _merge_product(found, "json-ld",
+                       name=node.get("name") if isinstance(node.get("name"), str) else None,
+                       price=price,
+                       currency=offer.get("priceCurrency"),
+                       availability=str(availability).rsplit("/", 1)[-1] if availability else None,
+                       images=_image_urls(node.get("image")))
+
+def _microdata_value(element) -> str:
+    for attr in ["content", "href", "src", "datetime"]:
+        if element.get(attr):
+            return element.get(attr).strip()
+    return element.get_text(strip=True)
+
+def _find_embedded_product(node, depth: int = 0, budget: list | None = None):
+    """walk embedded app state looking for a product-shaped dict"""
+    budget = budget if budget is not None else [5000]
+    if depth > 12 or budget[0] <= 0:
+        return None
+    budget[0] -= 1
+    if isinstance(node, dict):
+        has_name = isinstance(node.get("name") or node.get("title"), str)
+        has_price = any(key in node for key in ["price", "offers", "priceRange", "variants"])
+        if has_name and has_price:
+            return node
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        if isinstance(child, (dict, list)):
+            product = _find_embedded_product(child, depth + 1, budget)
+            if product:
+                return product
+    return None
+
+def _embedded_product_fields(product: dict, price_in_cents: bool = False) -> dict:
+    price = product.get("price")
+    if isinstance(price, dict):
+        price = price.get("amount") or price.get("value")
+    if price is None and isinstance(product.get("priceRange"), dict):
+        min_price = product["priceRange"].get("minVariantPrice") or {}
+        price = min_price.get("amount") if isinstance(min_price, dict) else min_price
+    if price is None and isinstance(product.get("variants"), list) and product["variants"]:
+        first_variant = product["variants"][0]
+        price = first_variant.get("price") if isinstance(first_variant, dict) else None
+        if isinstance(price, dict):
+            price = price.get("amount")
+    parsed_price = _parse_price(price)
+    if parsed_price is not None and price_in_cents and isinstance(price, int):
+        parsed_price = parsed_price / 100
+    available = product.get("available", product.get("availableForSale"))
+    return {
+        "name": product.get("title") or product.get("name"),
+        "price": parsed_price,
+        "currency": product.get("currency") or product.get("currencyCode"),
+        "availability": None if available is None else ("InStock" if available else "OutOfStock"),
+        "images": _image_urls(product.get("images") or product.get("featured_image") or product.get("image"))
+    }
+
+def extract_structured_data(soup) -> dict:
+    """parse json-ld, microdata, og/product meta tags and embedded store json for product facts in one pass"""
+    found = {"name": None, "price": None, "currency": None, "availability": None, "images": [],
+             "rating": None, "review_count": None, "review_items": None, "sources": []}
+
+    for script in soup.find_all("script"):
+        script_type = (script.get("type") or "").lower()
+        script_id = script.get("id") or ""
+        is_jsonld = script_type == "application/ld+json"
+        is_next_data = script_id == "__NEXT_DATA__"
+        is_shopify = script_type == "application/json" and (
+            script.has_attr("data-product-json") or script_id.startswith("ProductJson"))
+        if not (is_jsonld or is_next_data or is_shopify):
+            continue
+        txt = script.string or script.get_text()
+        if not txt or not txt.strip():
+            continue
+        try:
+            data = json.loads(txt.strip(), strict=False)
+        except ValueError:
+            continue
+        if is_jsonld:
+            _walk_jsonld(data, found)
+        elif is_shopify:
+            product = data.get("product", data) if isinstance(data, dict) else None
+            if isinstance(product, dict):
+                _merge_product(found, "shopify", **_embedded_product_fields(product, price_in_cents=True))
+        else:
+            product = _find_embedded_product(data.get("props", data) if isinstance(data, dict) else data)
+            if product:
+                _merge_product(found, "next-data", **_embedded_product_fields(product))
+
+    product_scope = soup.find(attrs={"itemtype": re.compile(r"schema\.org/Product", re.I)})
+    if product_scope:
+        props = {}
+        for element in product_scope.find_all(attrs={"itemprop": True}):
+            for prop in element.get("itemprop", "").split():
+                if prop not in props:
+                    props[prop] = _microdata_value(element)
+        availability = props.get("availability")
+        _merge_product(found, "microdata",
+                       name=props.get("name"),
+                       price=_parse_price(props.get("price") or props.get("lowPrice")),
+                       currency=props.get("priceCurrency"),
+                       availability=availability.rsplit("/", 1)[-1] if availability else None,
+                       images=_image_urls(props.get("image")),
+                       rating=_parse_price(props.get("ratingValue")),
+                       review_count=int(_parse_price(props.get("reviewCount")) or 0) or None)
+
+    meta_values = {}
+    for meta in soup.find_all("meta", attrs={"property": re.compile(r"^(?:og|product):", re.I)}):
+        meta_values.setdefault(meta.get("property").lower(), (meta.get("content") or "").strip())
+    _merge_product(found, "meta",
+                   price=_parse_price(meta_values.get("product:price:amount") or meta_values.get("og:price:amount")),
+                   currency=meta_values.get("product:price:currency") or meta_values.get("og:price:currency"),
+                   availability=meta_values.get("product:availability") or meta_values.get("og:availability"))
+
+    return found
+
+def structured_pricing_info(structured: dict, soup) -> dict | None:
+    """price fields from structured data, or None to leave the price to the page scan"""
+    amount = structured.get("price")
+    # a 0 price often stands in for variant pricing; only the page scan's free wording marks a product free
+    if not amount:
+        return None
+    currency = (structured.get("currency") or "").upper()
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    if not symbol and not currency:
+        # no currency in the markup: take the symbol the page prints next to this amount, if any
+        number = re.escape(f"{amount:,.2f}".removesuffix(".00")).replace(",", ",?")
+        match = re.search(r"([\$£€¥₹])\s*" + number + r"(?:\.0+)?(?![.,]?\d)", soup.get_text())
+        if not match:
+            return None
+        symbol = match.group(1)
+    if symbol:
+        price = f"{symbol}{amount:,.2f}"
+    else:
+        price = f"{amount:,.2f} {currency}"
+    return {"price": price, "is_free_product": False}
+
+def extract_basic_info(soup, keywords, structured=None) -> dict:
     """extract title and h1 using dynamic keywords"""
     title = soup.title.string.strip() if soup.title and soup.title.string else ""
     
@@ -217,11 +420,20 @@ def extract_basic_info(soup, keywords) -> dict:
     h1_elements = soup.find_all("h1")
     product_keywords = keywords["product"]
     
-    for h1_elem in h1_elements:
-        h1_text = h1_elem.get_text(strip=True)
-        if any(keyword in h1_text.lower() for keyword in product_keywords):
-            h1 = h1_text
-            break
+    product_name = ((structured or {}).get("name") or "").strip().lower()
+    if product_name:
+        for heading in soup.find_all(['h1', 'h2', 'h3']):
+            heading_text = heading.get_text(strip=True)
+            if heading_text.lower() == product_name:
+                h1 = heading_text
+                break
+    
+    if not h1:
+        for h1_elem in h1_elements:
+            h1_text = h1_elem.get_text(strip=True)
+            if any(keyword in h1_text.lower() for keyword in product_keywords):
+                h1 = h1_text
+                break
     
     if not h1:
         for h1_elem in h1_elements:
@@ -302,158 +514,139 @@ def extract_pricing_info(soup) -> dict:
     
     return {"price": price, "is_free_product": is_free_product}
 
-def extract_cta_info(soup, keywords) -> dict:
-    """extract cta info and positioning using dynamic keywords"""
-    add_to_cart = None
-    cta_texts = keywords["cta"] + [
-        "learn more", "find out more", "discover", "explore", "view details", "see more",
-        "download", "subscribe", "join now", "register", "create account", "free trial",
-        "start free", "get demo", "watch demo", "view demo", "try it free", "test drive",
-        "add to cart", "add to bag", "buy now", "purchase", "order now", "shop now",
-        "add to basket", "add to cart", "buy", "checkout", "proceed to checkout",
-        "add to wishlist", "save for later", "quick buy", "one-click buy"
-    ]
-    
-    exclude_patterns = [
-        "skip to", "skip", "navigation", "menu", "breadcrumb", "breadcrumbs",
-        "open media", "close", "modal", "popup", "overlay", "accessibility",
-        "screen reader", "sr-only", "visually hidden", "skip to content",
-        "skip to main", "skip to product", "skip to navigation"
-    ]
-    
-    for cta_text in cta_texts:
-        button_elements = soup.find_all(["button", "a", "input"])
-        for button_element in button_elements:
-            button_text = (
-                button_element.get("value") or 
-                button_element.get("aria-label") or 
-                button_element.get("title") or
-                button_element.get_text(strip=True)
-            ).lower()
-            
-            data_text = (
-                button_element.get("data-text") or 
-                button_element.get("data-label") or 
-                button_element.get("data-cta") or ""
-            ).lower()
-            
-            is_excluded = any(pattern in button_text for pattern in exclude_patterns)
-            if is_excluded:
+CTA_PHRASES = [
+    "learn more", "find out more", "discover", "explore", "view details", "see more",
+    "download", "subscribe", "join now", "register", "create account", "free trial",
+    "start free", "get demo", "watch demo", "view demo", "try it free", "test drive",
+    "add to cart", "add to bag", "buy now", "purchase", "order now", "shop now",
+    "add to basket", "add to cart", "buy", "checkout", "proceed to checkout",
+    "add to wishlist", "save for later", "quick buy", "one-click buy",
+    "get started", "start now", "try now", "try free", "sign up", "signup",
+    "contact sales", "talk to sales", "schedule demo", "book demo", "request demo"
+]
+
+CTA_EXCLUDE_PATTERNS = [
+    "skip to", "skip", "navigation", "menu", "breadcrumb", "breadcrumbs",
+    "open media", "close", "modal", "popup", "overlay", "accessibility",
+    "screen reader", "sr-only", "visually hidden", "skip to content",
+    "skip to main", "skip to product", "skip to navigation"
+]
+
+PRICE_NEAR_CTA_PATTERN = re.compile(
+    r'[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?|'
+    r'(?:per\s+(?:minute|month|year|day|hour|user|seat|license|unit)|/min|/mo|/yr|/day|/hr|/user|/seat)\s*[\$\£\€]\s*\d',
+    re.I
+)
+SHIPPING_RETURNS_WORDS = ["free shipping", "shipping", "delivery", "returns", "refund"]
+SHORT_TEXT_LIMIT = 256
+
+def _rank_cta_candidates(elements, phrases, require_interactive=False):
+    best = None
+    for position, element in enumerate(elements):
+        if require_interactive:
+            has_interactive_attrs = any(element.get(attr) for attr in ["onclick", "data-action", "role"])
+            if not (has_interactive_attrs or element.find_parent(["form", "button", "a"]) is not None):
                 continue
-                
-            if cta_text in button_text or cta_text in data_text:
-                add_to_cart = button_element.get_text(strip=True) or button_element.get("value") or button_element.get("aria-label")
+        label = (
+            element.get("value") or
+            element.get("aria-label") or
+            element.get("title") or
+            element.get_text(strip=True)
+        ).lower()
+        if any(pattern in label for pattern in CTA_EXCLUDE_PATTERNS):
+            continue
+        data_text = (
+            element.get("data-text") or
+            element.get("data-label") or
+            element.get("data-cta") or ""
+        ).lower()
+        rank = next((index for index, phrase in enumerate(phrases) if phrase in label or phrase in data_text), None)
+        if rank is not None and (best is None or rank < best[0]):
+            best = (rank, position, element)
+            if rank == 0:
                 break
-        if add_to_cart:
-            break
-            
-        if not add_to_cart:
-            button_elements = soup.find_all(["span", "div"])
-            for button_element in button_elements:
-                button_text = (
-                    button_element.get("value") or 
-                    button_element.get("aria-label") or 
-                    button_element.get("title") or
-                    button_element.get_text(strip=True)
-                ).lower()
-                
-                data_text = (
-                    button_element.get("data-text") or 
-                    button_element.get("data-label") or 
-                    button_element.get("data-cta") or ""
-                ).lower()
-                
-                is_excluded = any(pattern in button_text for pattern in exclude_patterns)
-                if is_excluded:
-                    continue
-                    
+    return best
 
-                has_interactive_attrs = any(button_element.get(attr) for attr in ["onclick", "data-action", "role"])
-                is_in_form = button_element.find_parent("form") is not None
-                is_in_button_context = button_element.find_parent(["button", "a"]) is not None
-                
-                if not (has_interactive_attrs or is_in_form or is_in_button_context):
-                    continue
-                    
-                if cta_text in button_text or cta_text in data_text:
-                    add_to_cart = button_element.get_text(strip=True) or button_element.get("value") or button_element.get("aria-label")
-                    break
-        if add_to_cart:
-            break
+def locate_cta(soup, keywords=None) -> dict:
+    """rank cta candidates; earlier phrases win, then clickables over span/div, then document order"""
+    phrases = (keywords["cta"] if keywords else []) + CTA_PHRASES
+    clickables = soup.find_all(["button", "a", "input"])
+    best = _rank_cta_candidates(clickables, phrases)
+    position = best[1] if best else None
+    if not best or best[0] > 0:
+        # a span/div only wins with a strictly earlier phrase, so only those phrases are tried
+        fallback = _rank_cta_candidates(soup.find_all(["span", "div"]), phrases[:best[0]] if best else phrases,
+                                        require_interactive=True)
+        if fallback:
+            best, position = fallback, None
 
-    cta_node = None
-    for cta_text in cta_texts:
-        button_elements = soup.find_all(["button", "a", "input"])
-        for button_element in button_elements:
-            button_text = (button_element.get("value") or button_element.get("aria-label") or button_element.get_text(strip=True)).lower()
-            
-            is_excluded = any(pattern in button_text for pattern in exclude_patterns)
-            if is_excluded:
+    node = best[2] if best else None
+    text = None
+    if node is not None:
+        text = node.get_text(strip=True) or node.get("value") or node.get("aria-label")
+    return {
+        "node": node,
+        "text": text,
+        "position": position,
+        "clickable_count": len(clickables)
+    }
+
+def annotate_text_flags(root) -> dict:
+    """compute text length and price/shipping flags for every node bottom-up, keyed by id()"""
+    flags = {}
+    for node in reversed([root] + list(root.descendants)):
+        if isinstance(node, NavigableString):
+            if type(node) not in (NavigableString, CData):
                 continue
-                
-            if cta_text in button_text:
-                cta_node = button_element
-                break
-        if cta_node:
+            text = node.strip()
+            lowered = text.lower()
+            flags[id(node)] = (
+                len(text),
+                text if len(text) <= SHORT_TEXT_LIMIT else None,
+                bool(PRICE_NEAR_CTA_PATTERN.search(text)),
+                any(word in lowered for word in SHIPPING_RETURNS_WORDS)
+            )
+            continue
+        child_flags = [flags[id(child)] for child in node.children if id(child) in flags]
+        length = sum(child[0] for child in child_flags)
+        has_price = any(child[2] for child in child_flags)
+        has_shipping = any(child[3] for child in child_flags)
+        text = None
+        if length <= SHORT_TEXT_LIMIT and all(child[1] is not None for child in child_flags):
+            # short subtrees are re-checked as joined text so "$" and "49" split across tags still match
+            text = "".join(child[1] for child in child_flags)
+            has_price = has_price or bool(PRICE_NEAR_CTA_PATTERN.search(text))
+            has_shipping = has_shipping or any(word in text.lower() for word in SHIPPING_RETURNS_WORDS)
+        flags[id(node)] = (length, text, has_price, has_shipping)
+    return flags
+
+def _cta_scopes(node, levels: int) -> list:
+    scopes = [node]
+    for _ in range(levels):
+        if scopes[-1].parent is None:
             break
+        scopes.append(scopes[-1].parent)
+    return scopes
 
-    price_near_cta = False
-    if cta_node:
-    
-        for scope in [cta_node, cta_node.parent, cta_node.parent.parent if cta_node.parent else None, 
-                     cta_node.parent.parent.parent if cta_node.parent and cta_node.parent.parent else None]:
-            if scope:
-                scope_text = scope.get_text(strip=True)
-                price_patterns = [
-                    r'[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?\s*(?:per\s+(?:minute|month|year|day|hour|user|seat|license|unit)|/min|/mo|/yr|/day|/hr|/user|/seat)',
-                    r'[\$\£\€]\d[\d,]*(?:\.\d{2})?',
-                    r'[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?',
-                    r'(?:per\s+(?:minute|month|year|day|hour|user|seat|license|unit)|/min|/mo|/yr|/day|/hr|/user|/seat)\s*[\$\£\€]\s*\d[\d,]*(?:\.\d{2})?'
-                ]
-                for pattern in price_patterns:
-                    if re.search(pattern, scope_text, re.I):
-                        price_near_cta = True
-                        break
-                if price_near_cta:
-                    break
-        
-        if not price_near_cta:
-            current = cta_node
-            for level in range(6):
-                if current and current.parent:
-                    parent = current.parent
-                    siblings = parent.find_all(['div', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    for sibling in siblings:
-                        sibling_text = sibling.get_text(strip=True)
-                        for pattern in price_patterns:
-                            if re.search(pattern, sibling_text, re.I):
-                                price_near_cta = True
-                                break
-                        if price_near_cta:
-                            break
-                    if price_near_cta:
-                        break
-                    current = current.parent
-                else:
-                    break
+def extract_cta_info(soup, keywords, cta=None) -> dict:
+    """extract cta info and positioning using dynamic keywords"""
+    cta = cta or locate_cta(soup, keywords)
+    cta_node = cta["node"]
 
+    price_near_cta = False
     cta_above_fold = False
-    if cta_node:
-        all_clickables = soup.find_all(["button", "a", "input"])
-        try:
-            cta_index = all_clickables.index(cta_node)
-            cta_above_fold = cta_index <= max(5, int(0.2 * len(all_clickables)))
-        except ValueError:
-            cta_above_fold = False
-
     shipping_returns_near_cta = False
-    if cta_node:
-        scope_text = (cta_node.parent or cta_node).get_text(strip=True).lower()
-        ship_ret_words = ["free shipping", "shipping", "delivery", "returns", "refund"]
-        shipping_returns_near_cta = any(word in scope_text for word in ship_ret_words)
+    if cta_node is not None:
+        scopes = _cta_scopes(cta_node, 6)
+        flags = annotate_text_flags(scopes[-1])
+        price_near_cta = any(flags[id(scope)][2] for scope in scopes)
+        shipping_returns_near_cta = flags[id(scopes[1] if len(scopes) > 1 else cta_node)][3]
+
+    if cta["position"] is not None:
+        cta_above_fold = cta["position"] <= max(5, int(0.2 * cta["clickable_count"]))
 
     return {
-        "cta": add_to_cart,
+        "cta": cta["text"],
         "price_near_cta": price_near_cta,
         "cta_above_fold": cta_above_fold,
         "shipping_returns_near_cta": shipping_returns_near_cta
@@ -486,8 +679,21 @@ def extract_image_info(soup) -> dict:
         "alt_coverage": alt_coverage
     }
 
-def extract_testimonial_info(soup) -> dict:
+def extract_testimonial_info(soup, structured=None, fallbacks=True) -> dict:
     """extract testimonials using multiple detection methods"""
+    if structured is None:
+        structured = extract_structured_data(soup)
+    structured_reviews = max(structured.get("review_count") or 0, structured.get("review_items") or 0)
+    average_rating = structured.get("rating")
+
+    # a marked-up review count is authoritative, so the dom-scanning fallbacks are skipped
+    if structured_reviews > 0:
+        return {
+            "testimonials": structured_reviews,
+            "has_reviews_or_ratings": True,
+            "average_rating": average_rating
+        }
+
     testimonials = 0
     
     testimonial_containers = soup.find_all(['div', 'section', 'article'], class_=re.compile(r'testimonial|customer|review|quote|feedback|endorsement', re.I))
@@ -495,9 +701,30 @@ def extract_testimonial_info(soup) -> dict:
         testimonial_items = container.find_all(['div', 'article', 'li', 'blockquote', 'p'], class_=re.compile(r'testimonial|customer|review|quote|feedback|endorsement', re.I))
         testimonials += len(testimonial_items)
     
-    if testimonials == 0:
-        quoted_text = soup.find_all(string=re.compile(r'"[^"]{20,}"', re.I))
-        testimonials = len(quoted_text)
+    if testimonials == 0 and fallbacks:
+        testimonials = count_testimonial_fallbacks(soup)
+
+    stars_present = "★" in soup.get_text() or "rating" in soup.get_text().lower() or "reviews" in soup.get_text().lower()
+    has_reviews_or_ratings = bool(testimonials or stars_present)
+
+    try:
+        page_text = soup.get_text(" ")
+        match = re.search(r"based on\s*(\d+)\s*reviews", page_text, re.I)
+        if match:
+            testimonials = max(testimonials, int(match.group(1)))
+    except Exception:
+        pass
+
+    return {
+        "testimonials": testimonials,
+        "has_reviews_or_ratings": has_reviews_or_ratings,
+        "average_rating": average_rating
+    }
+
+def count_testimonial_fallbacks(soup) -> int:
+    """count testimonials from loose text signals when no review containers exist"""
+    quoted_text = soup.find_all(string=re.compile(r'"[^"]{20,}"', re.I))
+    testimonials = len(quoted_text)
     
     if testimonials == 0:
         review_indicators = soup.find_all(string=re.compile(r'out of 5|based on \d+ reviews|customer review|reviewed by|\d+\s*stars?|\d+\s*★', re.I))
@@ -527,57 +754,14 @@ def extract_testimonial_info(soup) -> dict:
                 testimonials += int(match.group(1))
                 break
 
-    stars_present = "★" in soup.get_text() or "rating" in soup.get_text().lower() or "reviews" in soup.get_text().lower()
-    has_reviews_or_ratings = bool(testimonials or stars_present)
-
-    average_rating = None
-    jsonld_review_count = None
-    try:
-        scripts = soup.find_all("script", attrs={"type": "application/ld+json"})
-        for script in scripts:
-            txt = script.string or script.get_text()
-            if not txt:
-                continue
-            data = json.loads(txt.strip())
-            objs = data if isinstance(data, list) else [data]
-            for obj in objs:
-                if not isinstance(obj, dict):
-                    continue
-                ar = obj.get("aggregateRating")
-                if isinstance(ar, dict) and "ratingValue" in ar:
-                    average_rating = float(str(ar["ratingValue"]).strip())
-                    # capture review count if present
-                    if "reviewCount" in ar:
-                        try:
-                            jsonld_review_count = int(str(ar["reviewCount"]).strip())
-                        except Exception:
-                            pass
-                
-                if obj.get("@type") in ["Product", "Service", "Organization", "LocalBusiness"]:
-                    reviews = obj.get("review")
-                    if isinstance(reviews, list):
-                        try:
-                            jsonld_review_count = max(jsonld_review_count or 0, len(reviews))
-                        except Exception:
-                            pass
-        
-        if jsonld_review_count and jsonld_review_count > 0:
-            testimonials = max(testimonials, jsonld_review_count)
-    except Exception:
-        pass
-
-    try:
-        page_text = soup.get_text(" ")
-        match = re.search(r"based on\s*(\d+)\s*reviews", page_text, re.I)
-        if match:
-            testimonials = max(testimonials, int(match.group(1)))
-    except Exception:
-        pass
+    return testimonials
 
+def extract_testimonial_fallbacks(soup, result) -> dict:
+    """apply the text-scanning testimonial fallbacks on top of earlier results"""
+    testimonials = count_testimonial_fallbacks(soup)
     return {
-        "testimonials": testimonials,
-        "has_reviews_or_ratings": has_reviews_or_ratings,
-        "average_rating": average_rating
+        "testimonials": max(result.testimonials, testimonials),
+        "has_reviews_or_ratings": bool(result.has_reviews_or_ratings or testimonials)
     }
 
 def extract_trust_info(soup) -> dict:
@@ -628,7 +812,7 @@ def extract_trust_info(soup) -> dict:
         "trust_indicators": trust_indicators
     }
 
-def extract_technical_info(soup, response) -> dict:
+def extract_technical_info(soup, html: str) -> dict:
     """extract technical info, seo, accessibility, performance"""
     forms = soup.find_all('form')
     popups = soup.find_all(['[class*="modal"], [class*="popup"], [class*="overlay"]'])
@@ -654,7 +838,7 @@ def extract_technical_info(soup, response) -> dict:
     external_scripts = [s for s in scripts if s.get("src")]
     external_script_count = len(external_scripts)
     inline_script_count = len(scripts) - external_script_count
-    html_bytes = len(response.text.encode("utf-8"))
+    html_bytes = len(html.encode("utf-8"))
 
     unlabeled_buttons = sum(1 for b in soup.find_all("button") if not (b.get_text(strip=True) or b.get("aria-label")))
     unlabeled_links = sum(1 for a in soup.find_all("a") if not (a.get_text(strip=True) or a.get("aria-label")))
@@ -679,37 +863,87 @@ def extract_technical_info(soup, response) -> dict:
         "a11y_unlabeled_links": unlabeled_links
     }
 
-def calculate_conversion_scores(heuristics_data: dict) -> dict:
+SCORE_CATEGORIES = [
+    'value_proposition_clarity', 'cta_effectiveness', 'trust_social_proof', 'visual_imagery',
+    'mobile_accessibility', 'technical_performance', 'user_experience', 'conversion_optimization'
+]
+
+def check_categories(categories):
+    """raise ValueError for requested categories that are not scored"""
+    unknown = [category for category in categories or [] if category not in SCORE_CATEGORIES]
+    if unknown:
+        raise ValueError(f"unknown categories: {', '.join(unknown)}; expected any of {', '.join(SCORE_CATEGORIES)}")
+
+def get_score_weights(page_type: str) -> dict:
+    """get category weights for the overall score based on page type"""
+    if page_type == 'product':
+        weights = {
+            'value_proposition_clarity': 0.25,
+            'cta_effectiveness': 0.20,
+            'trust_social_proof': 0.15,
+            'visual_imagery': 0.15,
+            'mobile_accessibility': 0.10,
+            'technical_performance': 0.05,
+            'user_experience': 0.05,
+            'conversion_optimization': 0.05
+        }
+    elif page_type == 'homepage':
+        weights = {
+            'value_proposition_clarity': 0.30,
+            'cta_effectiveness': 0.10,
+            'trust_social_proof': 0.15,
+            'visual_imagery': 0.15,
+            'mobile_accessibility': 0.10,
+            'technical_performance': 0.05,
+            'user_experience': 0.10,
+            'conversion_optimization': 0.05
+        }
+    else:
+        weights = {
+            'value_proposition_clarity': 0.25,
+            'cta_effectiveness': 0.15,
+            'trust_social_proof': 0.15,
+            'visual_imagery': 0.15,
+            'mobile_accessibility': 0.10,
+            'technical_performance': 0.05,
+            'user_experience': 0.10,
+            'conversion_optimization': 0.05
+        }
+    return weights
+
+def calculate_conversion_scores(result, categories=None) -> dict:
     """calculate conversion-focused scores based on collected heuristics"""
+    if isinstance(result, dict):
+        result = HeuristicsResult.from_dict(result)
     scores = {}
-    site_type = heuristics_data.get('site_type', 'generic')
+    site_type = result.site_type
     
     clarity_score = 0
-    if heuristics_data.get('title') and len(heuristics_data['title']) > 10:
+    if result.title and len(result.title) > 10:
         clarity_score += 3
-    if heuristics_data.get('h1') and len(heuristics_data['h1']) > 5:
+    if result.h1 and len(result.h1) > 5:
         clarity_score += 3
     
-    if heuristics_data.get('price') and heuristics_data['price']:
+    if result.price:
         clarity_score += 2
-    elif heuristics_data.get('is_free_product'):
+    elif result.is_free_product:
         clarity_score += 2 
     elif site_type in ['saas', 'b2b']:
         clarity_score += 1
     
-    if heuristics_data.get('has_subheadings'):
+    if result.has_subheadings:
         clarity_score += 2
     scores['value_proposition_clarity'] = min(10, clarity_score)
     
     cta_score = 0
-    if heuristics_data.get('cta') and heuristics_data['cta']:
+    if result.cta:
         cta_score += 4
-    if heuristics_data.get('cta_above_fold'):
+    if result.cta_above_fold:
         cta_score += 3
-    if heuristics_data.get('price_near_cta'):
+    if result.price_near_cta:
         cta_score += 2
     
-    if site_type == 'ecommerce' and heuristics_data.get('shipping_returns_near_cta'):
+    if site_type == 'ecommerce' and result.shipping_returns_near_cta:
         cta_score += 1
     elif site_type != 'ecommerce':
         cta_score += 1
@@ -717,58 +951,69 @@ def calculate_conversion_scores(heuristics_data: dict) -> dict:
     scores['cta_effectiveness'] = min(10, cta_score)
     
     trust_score = 0
-    testimonials = heuristics_data.get('testimonials', 0)
+    testimonials = result.testimonials
     if testimonials > 0:
         trust_score += min(4, testimonials)
-    if heuristics_data.get('has_reviews_or_ratings'):
+    if result.has_reviews_or_ratings:
         trust_score += 2
-    if heuristics_data.get('average_rating') and heuristics_data['average_rating'] >= 4.0:
+    if result.average_rating and result.average_rating >= 4.0:
         trust_score += 2
-    if heuristics_data.get('trust_indicators', {}).get('effective_trust_badges', 0) > 0:
+    if result.trust_indicators.get('effective_trust_badges', 0) > 0:
         trust_score += 1
-    if heuristics_data.get('trust_indicators', {}).get('guarantees', 0) > 0:
+    if result.trust_indicators.get('guarantees', 0) > 0:
         trust_score += 1
     scores['trust_social_proof'] = min(10, trust_score)
     
     imagery_score = 0
-    image_count = heuristics_data.get('image_count', 0)
+    image_count = result.image_count
     if image_count > 0:
         imagery_score += 3
     if image_count >= 3:
         imagery_score += 2
     elif image_count >= 1:
         imagery_score += 1
-    alt_coverage = heuristics_data.get('alt_coverage', 0)
+    alt_coverage = result.alt_coverage
     if alt_coverage >= 0.8:
         imagery_score += 3
     elif alt_coverage >= 0.5:
         imagery_score += 2
     elif alt_coverage > 0:
         imagery_score += 1
-    if heuristics_data.get('gallery_present'):
+    if result.gallery_present:
         imagery_score += 2
     scores['visual_imagery'] = min(10, imagery_score)
     
     mobile_score = 0
-    if heuristics_data.get('viewport_present'):
+    if result.viewport_present:
         mobile_score += 4
-    a11y_buttons = heuristics_data.get('a11y_unlabeled_buttons', 0)
-    a11y_links = heuristics_data.get('a11y_unlabeled_links', 0)
+    a11y_buttons = result.a11y_unlabeled_buttons
+    a11y_links = result.a11y_unlabeled_links
     if a11y_buttons == 0 and a11y_links == 0:
         mobile_score += 3
     elif a11y_buttons <= 2 and a11y_links <= 5:
         mobile_score += 2
     elif a11y_buttons <= 5 and a11y_links <= 10:
         mobile_score += 1
-    if heuristics_data.get('alt_coverage', 0) >= 0.8:
+    if result.alt_coverage >= 0.8:
         mobile_score += 3
-    elif heuristics_data.get('alt_coverage', 0) > 0:
+    elif result.alt_coverage > 0:
         mobile_score += 1
     scores['mobile_accessibility'] = min(10, mobile_score)
     
     performance_score = 0
-    html_bytes = heuristics_data.get('html_bytes', 0)
-    if html_bytes < 200000:
+    html_bytes = result.html_bytes
+    page_weight = result.page_weight_bytes
+    if page_weight and result.assets_probed:
+        # probed weight includes images, scripts and stylesheets, so the tiers are wider
+        if page_weight < 1500000:
+            performance_score += 4
+        elif page_weight < 3000000:
+            performance_score += 3
+        elif page_weight < 6000000:
+            performance_score += 2
+        else:
+            performance_score += 1
+    elif html_bytes < 200000:
         performance_score += 4
     elif html_bytes < 1000000:
         performance_score += 3
@@ -777,121 +1022,158 @@ def calculate_conversion_scores(heuristics_data: dict) -> dict:
     else:
         performance_score += 1
     
-    external_scripts = heuristics_data.get('external_script_count', 0)
+    external_scripts = result.external_script_count
     if external_scripts < 15:
         performance_score += 2
     elif external_scripts < 30:
         performance_score += 1
-    if heuristics_data.get('meta_title_len', 0) >= 30 and heuristics_data.get('meta_title_len', 0) <= 60:
+    if result.meta_title_len >= 30 and result.meta_title_len <= 60:
         performance_score += 2
-    if heuristics_data.get('meta_description_len', 0) >= 120 and heuristics_data.get('meta_description_len', 0) <= 160:
+    if result.meta_description_len >= 120 and result.meta_description_len <= 160:
         performance_score += 2
     scores['technical_performance'] = min(10, performance_score)
     
     ux_score = 10
-    form_count = heuristics_data.get('form_count', 0)
+    form_count = result.form_count
     if form_count > 3:
         ux_score -= 2
-    popup_count = heuristics_data.get('popup_count', 0)
+    popup_count = result.popup_count
     if popup_count > 0:
         ux_score -= 3
-    if heuristics_data.get('modals_with_cta'):
+    if result.modals_with_cta:
         ux_score -= 2
-    if not heuristics_data.get('breadcrumbs_present'):
+    if not result.breadcrumbs_present:
         ux_score -= 1
-    if not heuristics_data.get('has_search'):
+    if not result.has_search:
         ux_score -= 1
     scores['user_experience'] = max(0, ux_score)
     
     conversion_score = 0
-    if heuristics_data.get('cta_grouping'):
+    if result.cta_grouping:
         conversion_score += 3
-    if heuristics_data.get('main_present'):
+    if result.main_present:
         conversion_score += 2
-    if heuristics_data.get('related_products_present'):
+    if result.related_products_present:
         conversion_score += 2
-    if heuristics_data.get('h1_count', 0) == 1:
+    if result.h1_count == 1:
         conversion_score += 2
-    if heuristics_data.get('section_count', 0) >= 3:
+    if result.section_count >= 3:
         conversion_score += 1
     scores['conversion_optimization'] = min(10, conversion_score)
     
-    page_type = heuristics_data.get('page_type', 'unknown')
-    
-    if page_type == 'product':
-        weights = {
-            'value_proposition_clarity': 0.25,
-            'cta_effectiveness': 0.20,
-            'trust_social_proof': 0.15,
-            'visual_imagery': 0.15,
-            'mobile_accessibility': 0.10,
-            'technical_performance': 0.05,
-            'user_experience': 0.05,
-            'conversion_optimization': 0.05
-        }
-    elif page_type == 'homepage':
-        weights = {
-            'value_proposition_clarity': 0.30,
-            'cta_effectiveness': 0.10,
-            'trust_social_proof': 0.15,
-            'visual_imagery': 0.15,
-            'mobile_accessibility': 0.10,
-            'technical_performance': 0.05,
-            'user_experience': 0.10,
-            'conversion_optimization': 0.05
-        }
-    else:
-        weights = {
-            'value_proposition_clarity': 0.25,
-            'cta_effectiveness': 0.15,
-            'trust_social_proof': 0.15,
-            'visual_imagery': 0.15,
-            'mobile_accessibility': 0.10,
-            'technical_performance': 0.05,
-            'user_experience': 0.10,
-            'conversion_optimization': 0.05
-        }
+    weights = get_score_weights(result.page_type)
+    if categories:
+        scores = {category: scores[category] for category in categories if category in scores}
+        selected_total = sum(weights[category] for category in scores)
+        weights = {category: weights[category] / selected_total for category in scores} if selected_total else {}
     
     overall_score = sum(scores[category] * weight for category, weight in weights.items())
     scores['overall_score'] = round(overall_score, 1)
     
     return scores
 
-def run_heuristics(url: str) -> dict:
-    """analyze product page and extract conversion signals"""
-    response = requests.get(url, timeout=12, headers={"User-Agent": "Mozilla/5.0"})
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    site_type = detect_site_type(soup)
-    page_type = detect_page_type(soup)
-    keywords = get_dynamic_keywords(site_type)
-    basic_info = extract_basic_info(soup, keywords)
-    pricing_info = extract_pricing_info(soup)
-    cta_info = extract_cta_info(soup, keywords)
-    image_info = extract_image_info(soup)
-    testimonial_info = extract_testimonial_info(soup)
-    trust_info = extract_trust_info(soup)
-    technical_info = extract_technical_info(soup, response)
-    
-    structure_data = summarize_structure(soup)
-
-    heuristics_data = {
-        "site_type": site_type,
-        "page_type": page_type,
-        **basic_info,
-        **pricing_info,
-        **cta_info,
-        **image_info,
-        **testimonial_info,
-        **trust_info,
-        **technical_info,
-        **structure_data
-    }
-    
-    conversion_scores = calculate_conversion_scores(heuristics_data)
-    
+def summarize_structured_data(structured: dict) -> dict:
+    """surface structured-data facts that feed the report"""
     return {
-        **heuristics_data,
-        "conversion_scores": conversion_scores
-    }
\ No newline at end of file
+        "availability": structured["availability"],
+        "product_image_count": len(structured["images"]),
+        "structured_data_sources": structured["sources"]
+    }
+
+# each extractor declares the context it reads, the score categories it feeds, a relative cost,
+# the site/page types it applies to (None = all), the optional context it requires to run at all
+# and an optional check that its signal is already settled
+EXTRACTION_PLAN = [
+    {"name": "structured_data", "run": summarize_structured_data, "inputs": ["structured"], "cost": 1,
+     "feeds": ["value_proposition_clarity", "trust_social_proof"]},
+    {"name": "structured_pricing", "run": structured_pricing_info, "inputs": ["structured", "soup"], "cost": 1,
+     "feeds": ["value_proposition_clarity"]},
+    {"name": "basic_info", "run": extract_basic_info, "inputs": ["soup", "keywords", "structured"], "cost": 2,
+     "feeds": ["value_proposition_clarity"]},
+    {"name": "technical", "run": extract_technical_info, "inputs": ["soup", "html"], "cost": 3,
+     "feeds": ["mobile_accessibility", "technical_performance", "user_experience", "conversion_optimization"]},
+    {"name": "images", "run": extract_image_info, "inputs": ["soup"], "cost": 3,
+     "feeds": ["visual_imagery", "mobile_accessibility"]},
+    {"name": "testimonials", "run": partial(extract_testimonial_info, fallbacks=False), "inputs": ["soup", "structured"],
+     "cost": 3, "feeds": ["trust_social_proof"]},
+    {"name": "pricing", "run": extract_pricing_info, "inputs": ["soup"], "cost": 4,
+     "feeds": ["value_proposition_clarity"], "settled": lambda result: bool(result.price)},
+    {"name": "structure", "run": summarize_structure, "inputs": ["soup", "cta"], "cost": 4,
+     "feeds": ["value_proposition_clarity", "visual_imagery", "user_experience", "conversion_optimization"]},
+    {"name": "trust", "run": extract_trust_info, "inputs": ["soup"], "cost": 5,
+     "feeds": ["trust_social_proof"]},
+    {"name": "cta", "run": extract_cta_info, "inputs": ["soup", "keywords", "cta"], "cost": 4,
+     "feeds": ["cta_effectiveness"]},
+    {"name": "testimonial_fallbacks", "run": extract_testimonial_fallbacks, "inputs": ["soup", "result"], "cost": 7,
+     "feeds": ["trust_social_proof"], "page_types": ["product", "category", "unknown"],
+     "settled": lambda result: result.testimonials > 0},
+    {"name": "asset_weight", "run": probe_page_weight, "inputs": ["soup", "url", "prober", "result"], "cost": 9,
+     "feeds": ["technical_performance"], "requires": ["url", "prober"]}
+]
+
+CONTEXT_PROVIDERS = {
+    "keywords": lambda context: get_dynamic_keywords(context["site_type"]),
+    "structured": lambda context: extract_structured_data(context["soup"]),
+    "cta": lambda context: locate_cta(context["soup"], get_dynamic_keywords(context["site_type"]))
+}
+
+def build_extraction_plan(site_type: str, page_type: str, categories, available=()) -> list:
+    """pick the extractors the requested score categories need, cheapest first"""
+    plan = []
+    for extractor in EXTRACTION_PLAN:
+        if not all(name in available for name in extractor.get("requires", [])):
+            continue
+        if extractor.get("site_types") and site_type not in extractor["site_types"]:
+            continue
+        if extractor.get("page_types") and page_type not in extractor["page_types"]:
+            continue
+        if not any(category in categories for category in extractor["feeds"]):
+            continue
+        plan.append(extractor)
+    return sorted(plan, key=lambda extractor: extractor["cost"])
+
+def analyze_document(html: str, categories=None, url=None, prober=None) -> HeuristicsResult:
+    """run the extraction plan over fetched html and score it; asset weight is probed only with a url and prober"""
+    check_categories(categories)
+    soup = BeautifulSoup(html, "html.parser")
+    page_text = soup.get_text().lower()
+    site_type = detect_site_type(soup, page_text)
+    page_type = detect_page_type(soup, page_text)
+    weights = get_score_weights(page_type)
+    selected = [category for category in (categories or SCORE_CATEGORIES) if weights.get(category)]
+
+    context = {"soup": soup, "html": html, "site_type": site_type}
+    if url and prober:
+        context.update(url=url, prober=prober)
+    result = HeuristicsResult.from_dict({"site_type": site_type, "page_type": page_type})
+    for extractor in build_extraction_plan(site_type, page_type, selected, context):
+        settled = extractor.get("settled")
+        if settled and settled(result):
+            continue
+        args = []
+        for name in extractor["inputs"]:
+            if name == "result":
+                args.append(result)
+                continue
+            if name not in context:
+                context[name] = CONTEXT_PROVIDERS[name](context)
+            args.append(context[name])
+        result.update(extractor["run"](*args) or {})
+
+    result.update({"conversion_scores": calculate_conversion_scores(result, selected if categories else None)})
+    return result
+
+def analyze_page(url: str, categories=None, prober=None, archive=None, fetcher=None) -> HeuristicsResult:
+    """fetch and analyze a page, keeping the typed result; the raw body is archived when an archive is given"""
+    response = fetch_page(url, fetcher)
+    if archive is not None:
+        try:
+            archive.put_response(response)
+        except Exception:
+            # archiving is a side effect; a full disk or a locked index must not fail the audit
+            logger.warning("archiving %s failed", url, exc_info=True)
+    return analyze_document(response.text, categories, response.url, prober)
+
+def run_heuristics(url: str, categories=None, prober=None, archive=None, fetcher=None) -> dict:
+    """analyze product page and extract conversion signals"""
+    return analyze_page(url, categories, prober, archive, fetcher).to_dict()
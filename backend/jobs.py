@@ -0,0 +1,118 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class JobQueue:
+    """sqlite-backed job queue drained by in-process asyncio workers"""
+
+    def __init__(self, path: str = "jobs.db", handlers: dict | None = None, workers: int = 2, poll_interval: float = 0.5):
+        self.handlers = handlers or {}
+        self.worker_count = workers
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.wakeup = None
+        self.tasks = []
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued', done INTEGER NOT NULL DEFAULT 0, total INTEGER,
+                result TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL);
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+        """)
+        self.db.commit()
+
+    def submit(self, kind: str, payload: dict, total: int | None = None) -> str:
+        if kind not in self.handlers:
+            raise ValueError(f"unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.db.execute("INSERT INTO jobs (id, kind, payload, total, created_at) VALUES (?, ?, ?, ?, ?)",
+                            (job_id, kind, json.dumps(payload), total, time.time()))
+            self.db.commit()
+        if self.wakeup:
+            self.wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self.lock:
+            row = self.db.execute("SELECT id, kind, payload, status, done, total, result, error, created_at, "
+                                  "started_at, finished_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "payload": json.loads(row[2]),
+            "status": row[3],
+            "progress": {"done": row[4], "total": row[5]},
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+            "created_at": row[8],
+            "started_at": row[9],
+            "finished_at": row[10]
+        }
+
+    def _claim(self) -> dict | None:
+        with self.lock:
+            row = self.db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if not row:
+                return None
+            self.db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row[0]))
+            self.db.commit()
+        return self.get(row[0])
+
+    def _progress(self, job_id: str, done: int, total: int | None = None, result=None):
+        with self.lock:
+            self.db.execute("UPDATE jobs SET done = ?, total = COALESCE(?, total), result = COALESCE(?, result) "
+                            "WHERE id = ?", (done, total, json.dumps(result) if result is not None else None, job_id))
+            self.db.commit()
+
+    def _finish(self, job_id: str, result=None, error: str | None = None):
+        with self.lock:
+            self.db.execute("UPDATE jobs SET status = ?, done = CASE WHEN ? IS NULL THEN COALESCE(total, done) "
+                            "ELSE done END, result = COALESCE(?, result), error = ?, finished_at = ? WHERE id = ?",
+                            ("failed" if error else "done", error,
+                             json.dumps(result) if result is not None else None, error, time.time(), job_id))
+            self.db.commit()
+
+    async def _worker(self):
+        while True:
+            job = self._claim()
+            if not job:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            def report(done, total=None, result=None, job_id=job["id"]):
+                self._progress(job_id, done, total, result)
+
+            try:
+                result = await self.handlers[job["kind"]](job, report)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                self._finish(job["id"], error=str(error))
+                continue
+            self._finish(job["id"], result)
+
+    async def start(self):
+        # jobs that were mid-run when the process stopped are picked up again
+        with self.lock:
+            self.db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self.db.commit()
+        self.wakeup = asyncio.Event()
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
@@ -1,44 +1,34 @@
+import asyncio
 import json
 import openai
 
-async def call_llm(heuristics_data: dict, api_key: str | None):
-    if not api_key:
-        # print("no api key provided, skipping llm analysis")  # debug
-        return None
-    
-    # print("calling openai api for analysis...")  # debug
-    openai_client = openai.OpenAI(api_key=api_key)
+from report_stream import ReportStreamParser
 
-    conversion_scores = heuristics_data.get('conversion_scores', {})
-    
-    analysis_prompt = f"""
-    You are a senior CRO & UX specialist with 10+ years of hands-on experience auditing product pages for e-commerce and SaaS businesses. 
-    You excel at identifying friction points, diagnosing why users drop off, and prescribing practical fixes that measurably improve conversion. 
-    Analyze the PRODUCT PAGE SIGNALS below and return STRICT JSON only.
-    
-    PRODUCT PAGE SIGNALS:
-    {json.dumps(heuristics_data, ensure_ascii=False, separators=(',', ':'))}
+LLM_MODEL = "gpt-4o-mini"
 
-    CONVERSION SCORES (already calculated):
-    {json.dumps(conversion_scores, ensure_ascii=False, separators=(',', ':'))}
+ANALYST_ROLE = """
+    You are a senior CRO & UX specialist with 10+ years of hands-on experience auditing product pages for e-commerce and SaaS businesses.
+    You excel at identifying friction points, diagnosing why users drop off, and prescribing practical fixes that measurably improve conversion.
+"""
 
+REPORT_INSTRUCTIONS = """
     Your task is to provide actionable recommendations based on these scores and signals. Focus on:
     1. Explaining WHY scores are low/high based on the specific heuristics
     2. Providing concrete, implementable fixes
     3. Prioritizing by conversion impact
 
     RETURN JSON WITH EXACT KEYS:
-    {{
+    {
       "summary": "1–2 sentence diagnosis focused on conversion risks and quick upside.",
-      "score_analysis": {{
+      "score_analysis": {
         "strengths": ["what's working well based on high scores", "..."],
         "weaknesses": ["what's hurting conversion based on low scores", "..."]
-      }},
+      },
       "top_issues": [],                 // 3–6 items
       "quick_wins": [],                 // 3–6 items
       "prioritized_actions": [],        // 3–8 items; see schema below
       "copy_suggestions": []            // optional
-    }}
+    }
 
     CONSTRAINTS:
     - Only include actions that are clearly justified by the provided signals/scores.
@@ -55,14 +45,284 @@ async def call_llm(heuristics_data: dict, api_key: str | None):
     - impact: integer (1..3)
     - confidence: integer (1..3)
     - effort: integer (1..3)
-    """
+"""
+
+# signals kept in the per-page payload when several pages share one prompt
+COMPACT_SIGNALS = [
+    "site_type", "page_type", "title", "h1", "price", "is_free_product", "cta", "price_near_cta",
+    "cta_above_fold", "shipping_returns_near_cta", "image_count", "alt_coverage", "gallery_present",
+    "testimonials", "has_reviews_or_ratings", "average_rating", "guarantees", "viewport_present",
+    "a11y_unlabeled_buttons", "a11y_unlabeled_links", "html_bytes", "external_script_count",
+    "meta_title_len", "meta_description_len", "form_count", "popup_count", "modals_with_cta",
+    "breadcrumbs_present", "has_search", "cta_grouping", "main_present", "related_products_present", "h1_count"
+]
+
+
+def compact_signals(heuristics_data: dict) -> dict:
+    """reduce heuristics to the scores and flat signals the report instructions reference"""
+    signals = {name: heuristics_data[name] for name in COMPACT_SIGNALS if name in heuristics_data}
+    signals["conversion_scores"] = heuristics_data.get("conversion_scores", {})
+    return signals
+
+
+_clients = {}
+
+
+def make_client(api_key: str, base_url: str | None = None):
+    """one client (and connection pool) per key and base url, recreated if the event loop changed"""
+    loop = asyncio.get_running_loop()
+    loop_and_client = _clients.get((api_key, base_url))
+    if loop_and_client is None or loop_and_client[0] is not loop:
+        loop_and_client = _clients[(api_key, base_url)] = (loop, openai.AsyncOpenAI(api_key=api_key, base_url=base_url))
+    return loop_and_client[1]
+
+
+async def close_clients():
+    loop = asyncio.get_running_loop()
+    for key, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.close()
+        del _clients[key]
+
+
+def build_analysis_prompt(heuristics_data: dict) -> str:
+    conversion_scores = heuristics_data.get('conversion_scores', {})
+
+    analysis_prompt = f"""{ANALYST_ROLE}
+    Analyze the PRODUCT PAGE SIGNALS below and return STRICT JSON only.
+
+    PRODUCT PAGE SIGNALS:
+    {json.dumps(heuristics_data, ensure_ascii=False, separators=(',', ':'))}
 
-    api_response = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
+    CONVERSION SCORES (already calculated):
+    {json.dumps(conversion_scores, ensure_ascii=False, separators=(',', ':'))}
+{REPORT_INSTRUCTIONS}"""
+    return analysis_prompt
+
+
+async def call_llm(heuristics_data: dict, api_key: str | None, cache=None):
+    if not api_key:
+        # print("no api key provided, skipping llm analysis")  # debug
+        return None
+
+    cache_key = cache.key(heuristics_data) if cache else None
+    if cache:
+        cached_report = cache.get(cache_key)
+        if cached_report is not None:
+            return cached_report
+
+    # print("calling openai api for analysis...")  # debug
+    openai_client = make_client(api_key)
+
+    analysis_prompt = build_analysis_prompt(heuristics_data)
+
+    api_response = await openai_client.chat.completions.create(
+        model=LLM_MODEL,
         messages=[{"role":"user","content":analysis_prompt}],
         response_format={ "type": "json_object" }
     )
-    
+
     llm_result = api_response.choices[0].message.content
+    if cache:
+        cache.put(cache_key, llm_result)
     # print(f"llm response received: {llm_result[:100]}...")  # debug
-    return llm_result
\ No newline at end of file
+    return llm_result
+
+
+async def stream_llm(heuristics_data: dict, api_key: str | None, cache=None):
+    """stream the report, yielding each section as soon as it is complete and valid"""
+    if not api_key:
+        return
+
+    cache_key = cache.key(heuristics_data) if cache else None
+    parser = ReportStreamParser()
+    cached_report = cache.get(cache_key) if cache else None
+    if cached_report is not None:
+        for event in parser.feed(cached_report):
+            yield event
+        yield {"event": "report", "data": parser.result()}
+        return
+
+    openai_client = make_client(api_key)
+    stream = await openai_client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": build_analysis_prompt(heuristics_data)}],
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    chunks = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        chunks.append(delta)
+        for event in parser.feed(delta):
+            yield event
+
+    report = parser.result()
+    if cache and report is not None:
+        cache.put(cache_key, "".join(chunks))
+    yield {"event": "report", "data": report}
+
+
+COMPARISON_INSTRUCTIONS = """
+    Explain where the BASELINE page trails its competitors and what to copy from them. Focus on:
+    1. Categories with negative deltas (baseline behind) and the signal differences that explain them
+    2. Where the baseline is already ahead and should not change
+    3. Concrete fixes, prioritized by conversion impact
+
+    RETURN JSON WITH EXACT KEYS:
+    {
+      "summary": "1–2 sentence comparison focused on the biggest gaps.",
+      "gaps": [],                       // categories where the baseline trails, each with the competitor that leads
+      "advantages": [],                 // categories where the baseline leads
+      "prioritized_actions": []         // 3–8 items; same item schema as below
+    }
+
+    CONSTRAINTS:
+    - Only use the provided scores, deltas and signal differences; reference them in each "why"
+      (e.g., "cta_effectiveness delta +3 on competitor, cta_above_fold=[false,true]").
+    - Effort/Impact/Confidence must be integers in 1..3.
+    - Output ONLY valid JSON (no markdown, no prose).
+
+    ITEM SCHEMA for each entry in prioritized_actions:
+    - action: string
+    - why: string (must reference specific signals/deltas)
+    - impact: integer (1..3)
+    - confidence: integer (1..3)
+    - effort: integer (1..3)
+"""
+
+
+def build_comparison_prompt(comparison: dict) -> str:
+    """one prompt over the baseline's signals and each competitor's score deltas and differing signals"""
+    return f"""{ANALYST_ROLE}
+    Compare the BASELINE product page with its COMPETITORS and return STRICT JSON only.
+    Each competitor lists its conversion_scores, deltas (competitor minus baseline) and
+    signal_diff (only the signals that differ, as [baseline, competitor]).
+
+    COMPARISON:
+{json.dumps(comparison, ensure_ascii=False, separators=(',', ':'))}
+{COMPARISON_INSTRUCTIONS}"""
+
+
+async def call_comparison_llm(comparison: dict, api_key: str | None, base_url: str | None = None):
+    if not api_key:
+        return None
+    openai_client = make_client(api_key, base_url)
+    api_response = await openai_client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": build_comparison_prompt(comparison)}],
+        response_format={"type": "json_object"}
+    )
+    return api_response.choices[0].message.content
+
+
+def build_batch_prompt(pages: dict) -> str:
+    """one prompt covering several pages, keyed so the answer can be split back per page"""
+    return f"""{ANALYST_ROLE}
+    Analyze EACH page in PAGES below independently and return STRICT JSON only.
+    PAGES maps a page key to that page's signals and already-calculated conversion_scores.
+
+    PAGES:
+{json.dumps(pages, ensure_ascii=False, separators=(',', ':'))}
+{REPORT_INSTRUCTIONS}
+    BATCH OUTPUT:
+    - Return ONE JSON object whose keys are exactly the page keys from PAGES.
+    - Each value is that page's report with the exact keys above.
+"""
+
+
+class LLMBatcher:
+    """group several pages into one completion, flushing on batch size or interval"""
+
+    def __init__(self, api_key: str | None, batch_size: int = 5, flush_interval: float = 2.0,
+                 base_url: str | None = None, cache=None):
+        self.api_key = api_key
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.base_url = base_url
+        self.cache = cache
+        self.pending = []
+        self.flush_task = None
+        self.in_flight = set()
+        self.batches_sent = 0
+        self.pages_sent = 0
+
+    async def submit(self, heuristics_data: dict):
+        if not self.api_key:
+            return None
+        cache_key = self.cache.key(heuristics_data) if self.cache else None
+        if self.cache:
+            cached_report = self.cache.get(cache_key)
+            if cached_report is not None:
+                return cached_report
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((compact_signals(heuristics_data), cache_key, future))
+        if len(self.pending) >= self.batch_size:
+            self._start_flush()
+        elif not self.flush_task:
+            self.flush_task = asyncio.create_task(self._flush_later())
+        return await future
+
+    def _start_flush(self):
+        batch, self.pending = self.pending, []
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        task = asyncio.create_task(self._send(batch))
+        self.in_flight.add(task)
+        task.add_done_callback(self.in_flight.discard)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self.flush_task = None
+        if self.pending:
+            batch, self.pending = self.pending, []
+            await self._send(batch)
+
+    async def flush(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if self.pending:
+            batch, self.pending = self.pending, []
+            await self._send(batch)
+
+    async def _send(self, batch: list):
+        pages = {f"p{index}": signals for index, (signals, _, _) in enumerate(batch, 1)}
+        try:
+            api_response = await make_client(self.api_key, self.base_url).chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "user", "content": build_batch_prompt(pages)}],
+                response_format={"type": "json_object"}
+            )
+            reports = json.loads(api_response.choices[0].message.content)
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.batches_sent += 1
+        self.pages_sent += len(batch)
+        for index, (_, cache_key, future) in enumerate(batch, 1):
+            report = reports.get(f"p{index}") if isinstance(reports, dict) else None
+            if future.done():
+                continue
+            if report is None:
+                # a page the model left out is a failed report, not an unconfigured llm
+                future.set_exception(ValueError(f"batch response missing page p{index}"))
+                continue
+            llm_result = json.dumps(report, ensure_ascii=False)
+            if self.cache:
+                self.cache.put(cache_key, llm_result)
+            future.set_result(llm_result)
+
+    def stats(self) -> dict:
+        return {
+            "batches_sent": self.batches_sent,
+            "pages_sent": self.pages_sent,
+            "pending": len(self.pending)
+        }
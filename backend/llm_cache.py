@@ -0,0 +1,69 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+# boolean/categorical signals the prompt constraints branch on; pages that agree on these
+# and on quantized scores get the same report
+PROMPT_SIGNALS = [
+    "site_type", "page_type", "price_near_cta", "cta_above_fold", "shipping_returns_near_cta",
+    "is_free_product", "has_reviews_or_ratings", "cta_grouping", "modals_with_cta",
+    "viewport_present", "breadcrumbs_present", "has_search", "related_products_present",
+    "gallery_present", "main_present"
+]
+
+
+def signal_fingerprint(heuristics_data: dict, granularity: float = 1.0) -> str:
+    """hash quantized conversion scores plus prompt-relevant signals"""
+    scores = heuristics_data.get("conversion_scores", {})
+    if granularity > 0:
+        quantized = {name: round(score / granularity) for name, score in scores.items() if name != "overall_score"}
+    else:
+        quantized = {name: score for name, score in scores.items() if name != "overall_score"}
+    signals = {name: heuristics_data.get(name) for name in PROMPT_SIGNALS}
+    payload = json.dumps([quantized, signals], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """lru cache of llm reports keyed by signal fingerprint"""
+
+    def __init__(self, max_entries: int = 1000, granularity: float = 1.0):
+        self.max_entries = max_entries
+        self.granularity = granularity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, heuristics_data: dict) -> str:
+        return signal_fingerprint(heuristics_data, self.granularity)
+
+    def get(self, key: str):
+        report = self.entries.get(key)
+        if report is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return report
+
+    def put(self, key: str, report):
+        if report is None or self.max_entries <= 0:
+            return
+        self.entries[key] = report
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "granularity": self.granularity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# capacity baseline for /api/analyze: python loadtest.py --rps 20 --duration 30 --workers 2
+import argparse
+import asyncio
+import glob
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_PAGE = """<!doctype html><html><head><title>Load test truffle box {index} | Stub Store</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="description" content="Stub storefront product page used to load test the analyzer.">
+<script src="/static/app.js"></script></head>
+<body><nav class="breadcrumb"><a href="/">Home</a></nav><main>
+<h1>Assorted Truffle Box {index}</h1><p class="price">$49.00</p>
+<form><select name="size"><option>12 pieces</option></select><button>Add to cart</button></form>
+<p>Free shipping and free returns on every order.</p>
+<section><h2>Reviews</h2><div class="review">Rated 4.8 by 120 customers. Amazing!</div></section>
+<img src="/img/{index}-1.jpg" alt="truffle box"><img src="/img/{index}-2.jpg" alt="open box">
+<div class="padding">{padding}</div></main></body></html>"""
+
+MOCK_REPORT = {
+    "summary": "Load test report.",
+    "score_analysis": {"strengths": ["cta_effectiveness is high"], "weaknesses": []},
+    "top_issues": [], "quick_wins": [], "copy_suggestions": [],
+    "prioritized_actions": [{"action": "Keep CTA", "why": "cta_effectiveness=9", "impact": 1, "confidence": 3, "effort": 1}]
+}
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def load_corpus(corpus: str | None, page_kb: int) -> list:
+    """html pages to serve: files from a corpus directory, or generated pages padded to page_kb"""
+    if corpus:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(corpus, "**", "*.htm*"), recursive=True)):
+            with open(path, "rb") as file:
+                pages.append(file.read())
+        if pages:
+            return pages
+    padding = "<p>" + "lorem ipsum dolor sit amet " * max(0, page_kb * 1024 // 27) + "</p>"
+    return [STUB_PAGE.format(index=index, padding=padding).encode("utf-8") for index in range(20)]
+
+
+def stub_handler(pages: list, latency: float, llm_latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        # one threaded server plays both the storefront and the openai-compatible completion api
+        protocol_version = "HTTP/1.1"
+
+        def send_body(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            index = sum(self.path.encode()) % len(pages)
+            self.send_body(pages[index], "text/html; charset=utf-8")
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(llm_latency)
+            self.send_body(json.dumps({
+                "id": "loadtest", "object": "chat.completion", "created": 0, "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": json.dumps(MOCK_REPORT)}}]
+            }).encode(), "application/json")
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+async def http_request(host: str, port: int, method: str, path: str, body: bytes = b"") -> tuple:
+    """minimal http/1.1 client: one connection per request, returns (status, body)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n"
+                      f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        response = await reader.read()
+        return status, response.split(b"\r\n\r\n", 1)[-1]
+    finally:
+        writer.close()
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    pick = lambda fraction: round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 1)
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 1)}
+
+
+def worker_rss(parent_pid: int) -> dict:
+    """resident memory in MB of the uvicorn workers (children of the server process), read from /proc"""
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as file:
+                status = dict(line.split(":", 1) for line in file if ":" in line)
+        except OSError:
+            continue
+        pid = int(entry)
+        if pid == parent_pid or int(status["PPid"]) == parent_pid:
+            rss[pid] = round(int(status.get("VmRSS", "0 kB").split()[0]) / 1024, 1)
+    return rss
+
+
+async def wait_until_healthy(port: int, timeout: float = 30):
+    expires = time.monotonic() + timeout
+    while time.monotonic() < expires:
+        try:
+            status, _ = await http_request("127.0.0.1", port, "GET", "/health")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("api server did not become healthy")
+
+
+async def drive(port: int, store_url: str, rps: float, duration: float, server_pid: int) -> dict:
+    """open-loop load: request i starts at i / rps whether or not earlier ones have finished"""
+    latencies, statuses, errors = [], {}, []
+    peak_rss = {}
+    total = int(rps * duration)
+
+    async def one(index: int):
+        # distinct urls so single-flight coalescing does not hide the work
+        payload = json.dumps({"url": f"{store_url}/products/{index}?run={index}"}).encode()
+        started = time.perf_counter()
+        try:
+            status, _ = await http_request("127.0.0.1", port, "POST", "/api/analyze", payload)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+        except OSError as error:
+            errors.append(str(error))
+
+    async def sample_memory():
+        while True:
+            for pid, mb in worker_rss(server_pid).items():
+                peak_rss[pid] = max(peak_rss.get(pid, 0), mb)
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    tasks = []
+    for index in range(total):
+        delay = started + index / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+
+    # /metrics lands on one worker per call, so poll it a few times to see each worker's loop lag
+    loop_lag = {}
+    for _ in range(8 * max(1, len(peak_rss))):
+        status, body = await http_request("127.0.0.1", port, "GET", "/metrics")
+        if status == 200:
+            metrics = json.loads(body)
+            loop_lag[metrics["worker_pid"]] = metrics["loop_lag"]
+
+    return {
+        "target_rps": rps,
+        "sent": total,
+        "completed": len(latencies),
+        "statuses": statuses,
+        "connection_errors": len(errors),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency": percentiles(latencies),
+        "workers": {pid: {"peak_rss_mb": peak_rss.get(pid), "loop_lag": lag} for pid, lag in loop_lag.items()},
+        # the uvicorn supervisor and multiprocessing helpers when running more than one worker
+        "other_processes_rss_mb": {pid: mb for pid, mb in peak_rss.items() if pid not in loop_lag}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="drive /api/analyze against a local stub storefront and mock llm")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--corpus", help="directory of .html files to serve (default: generated product pages)")
+    parser.add_argument("--page-kb", type=int, default=100, help="padding for generated pages")
+    parser.add_argument("--latency-ms", type=float, default=50, help="storefront response delay")
+    parser.add_argument("--llm-latency-ms", type=float, default=500, help="mock completion delay")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the llm report cache on (off by default)")
+    parser.add_argument("--port", type=int, help="api port (default: a free port)")
+    args = parser.parse_args(argv)
+
+    pages = load_corpus(args.corpus, args.page_kb)
+    stub = ThreadingHTTPServer(("127.0.0.1", 0),
+                               stub_handler(pages, args.latency_ms / 1000, args.llm_latency_ms / 1000))
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{stub.server_port}"
+
+    port = args.port or free_port()
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "LLM_CACHE_SIZE": os.environ.get("LLM_CACHE_SIZE", "1000") if args.llm_cache else "0",
+        "HTML_ARCHIVE_DIR": "",
+        "JOBS_DB_PATH": os.path.join(scratch, "jobs.db"),
+        "CRAWL_FRONTIER_PATH": os.path.join(scratch, "frontier.db")
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env
+    )
+    try:
+        asyncio.run(wait_until_healthy(port))
+        report = asyncio.run(drive(port, stub_url, args.rps, args.duration, server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+        stub.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
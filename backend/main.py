@@ -1,21 +1,174 @@
-import os, re
+import os, re, asyncio, json, time
+from functools import partial
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from dotenv import load_dotenv
 
-from heuristic import run_heuristics
-from llm import call_llm
+from heuristic import run_heuristics, check_categories
+from llm import call_llm, call_comparison_llm, stream_llm, close_clients, LLMBatcher
+from llm_cache import ReportCache
+from crawl import Frontier, Politeness, crawl_domain, normalize_domain, normalize_url
+from jobs import JobQueue
+from singleflight import SingleFlight
+from serialize import check_format, parse_report, project_result, render
+from prescan import QUICK_CATEGORIES, check_mode, quick_audit
+from assets import AssetProber, AssetSizeCache
+from archive import HtmlArchive
+from fetch import Fetcher
+from compare import build_comparison
+from loop_monitor import LoopLagMonitor
 
 load_dotenv()
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+report_cache = ReportCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "1000")),
+    granularity=float(os.getenv("LLM_CACHE_GRANULARITY", "1"))
+)
+llm_batcher = LLMBatcher(
+    OPENAI_KEY,
+    batch_size=int(os.getenv("LLM_BATCH_SIZE", "5")),
+    flush_interval=float(os.getenv("LLM_BATCH_FLUSH_SECONDS", "2")),
+    cache=report_cache
+)
+# fetched html is archived for re-scoring unless HTML_ARCHIVE_DIR is set to an empty string
+HTML_ARCHIVE_DIR = os.getenv("HTML_ARCHIVE_DIR", "html_archive")
+html_archive = HtmlArchive(HTML_ARCHIVE_DIR) if HTML_ARCHIVE_DIR else None
+page_fetcher = Fetcher(
+    default_timeout=float(os.getenv("FETCH_TIMEOUT", "12")),
+    min_timeout=float(os.getenv("FETCH_MIN_TIMEOUT", "2")),
+    hedge=os.getenv("FETCH_HEDGE", "0") == "1",
+    hedge_ratio=float(os.getenv("FETCH_HEDGE_RATIO", "0.1"))
+)
+# crawls never hedge: a second request to the same host would go around the crawl's politeness delay
+crawl_fetcher = Fetcher(
+    default_timeout=float(os.getenv("FETCH_TIMEOUT", "12")),
+    min_timeout=float(os.getenv("FETCH_MIN_TIMEOUT", "2"))
+)
+audit_page = partial(run_heuristics, archive=html_archive, fetcher=page_fetcher)
+crawl_page = partial(run_heuristics, archive=html_archive, fetcher=crawl_fetcher)
+asset_prober = AssetProber(
+    workers=int(os.getenv("ASSET_PROBE_WORKERS", "16")),
+    per_host=int(os.getenv("ASSET_PROBE_PER_HOST", "4")),
+    deadline=float(os.getenv("ASSET_PROBE_DEADLINE", "3")),
+    cache=AssetSizeCache(int(os.getenv("ASSET_CACHE_SIZE", "10000")))
+)
 
 class AnalyzeRequest(BaseModel):
     url: str
+    categories: list[str] | None = None
+    mode: str = "full"
+    probe_assets: bool = False
+
+class CompareRequest(BaseModel):
+    urls: list[str]
+    categories: list[str] | None = None
+
+class CrawlRequest(BaseModel):
+    domain: str
+    max_pages: int = 20
+
+class JobRequest(BaseModel):
+    url: str | None = None
+    urls: list[str] | None = None
+    domain: str | None = None
+    max_pages: int = 20
 
 app = FastAPI()
+frontier = Frontier(os.getenv("CRAWL_FRONTIER_PATH", "crawl_frontier.db"))
+politeness = Politeness(float(os.getenv("CRAWL_MIN_DELAY", "1.0")))
+inflight = SingleFlight()
+loop_lag = LoopLagMonitor(float(os.getenv("LOOP_LAG_INTERVAL", "0.1")))
+
+def audit_key(url: str, categories: list[str] | None = None, probe_assets: bool = False) -> str:
+    return normalize_url(url) + ("#" + ",".join(sorted(categories)) if categories else "") + ("#assets" if probe_assets else "")
+
+async def shared_heuristics(url: str, categories: list[str] | None = None, probe_assets: bool = False) -> dict:
+    # full audits and batch pages for the same url share one fetch and extraction
+    return await inflight.do(audit_key(url, categories, probe_assets) + "#heuristics", lambda: asyncio.to_thread(
+        audit_page, url, categories, asset_prober if probe_assets else None))
+
+async def audit_url(url: str, categories: list[str] | None = None, probe_assets: bool = False) -> dict:
+    heuristics_data = await shared_heuristics(url, categories, probe_assets)
+    llm_analysis = await call_llm(heuristics_data, OPENAI_KEY, report_cache)
+    return {
+        "url": url,
+        "heuristics": heuristics_data,
+        "llm_report": parse_report(llm_analysis) or "LLM not configured"
+    }
+
+async def coalesced_audit(url: str, categories: list[str] | None = None, probe_assets: bool = False) -> dict:
+    result = await inflight.do(audit_key(url, categories, probe_assets), lambda: audit_url(url, categories, probe_assets))
+    return {**result, "url": url}
+
+async def run_audit_job(job: dict, report) -> dict:
+    return await coalesced_audit(job["payload"]["url"])
+
+async def run_batch_job(job: dict, report) -> dict:
+    urls = list(dict.fromkeys(job["payload"]["urls"]))
+    results = job["result"] or {}
+    fetch_slots = asyncio.Semaphore(int(os.getenv("BATCH_FETCH_CONCURRENCY", "4")))
+    # progress counts are cheap; the results json is rewritten at most once per interval
+    checkpoint_interval = float(os.getenv("BATCH_CHECKPOINT_SECONDS", "5"))
+    last_checkpoint = time.monotonic()
+
+    # pages are fetched concurrently so their llm reports can share batched completions
+    async def audit_batched(url):
+        nonlocal last_checkpoint
+        try:
+            async with fetch_slots:
+                heuristics_data = await shared_heuristics(url)
+            try:
+                llm_analysis = await llm_batcher.submit(heuristics_data)
+            except Exception as error:
+                llm_analysis = {"error": str(error)}
+            results[url] = {
+                "url": url,
+                "heuristics": heuristics_data,
+                "llm_report": parse_report(llm_analysis) or "LLM not configured"
+            }
+        except Exception as error:
+            results[url] = {"url": url, "error": str(error)}
+        if time.monotonic() - last_checkpoint >= checkpoint_interval:
+            last_checkpoint = time.monotonic()
+            report(len(results), len(urls), results)
+        else:
+            report(len(results), len(urls))
+
+    await asyncio.gather(*[audit_batched(url) for url in urls if url not in results])
+    return results
+
+async def run_crawl_job(job: dict, report) -> dict:
+    payload = job["payload"]
+    results = []
+
+    def crawl_with_progress():
+        for result in crawl_domain(payload["domain"], crawl_page, frontier, politeness, payload["max_pages"]):
+            results.append(result)
+            report(len(results), payload["max_pages"])
+
+    await asyncio.to_thread(crawl_with_progress)
+    return {"domain": payload["domain"], "results": results, "frontier": frontier.counts(normalize_domain(payload["domain"]))}
+
+job_queue = JobQueue(
+    os.getenv("JOBS_DB_PATH", "jobs.db"),
+    handlers={"audit": run_audit_job, "batch": run_batch_job, "crawl": run_crawl_job},
+    workers=int(os.getenv("JOB_WORKERS", "2"))
+)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    await job_queue.start()
+    loop_lag.start()
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await job_queue.stop()
+    await loop_lag.stop()
+    await close_clients()
+
 templates = Jinja2Templates(directory="../frontend/")
 app.mount("/static", StaticFiles(directory="../frontend/"), name="static")
 
@@ -23,25 +176,139 @@ app.mount("/static", StaticFiles(directory="../frontend/"), name="static")
 def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+def wants_quick_audit(request: AnalyzeRequest) -> bool:
+    # the prescan covers these categories without building a tree or calling the llm
+    if request.mode == "quick":
+        return True
+    return bool(request.categories) and set(request.categories) <= set(QUICK_CATEGORIES)
+
 @app.post("/api/analyze")
-async def analyze(request: AnalyzeRequest):
+async def analyze(request: AnalyzeRequest, http_request: Request, fields: str | None = None, format: str | None = None):
+    accept = http_request.headers.get("accept")
     try:
+        check_format(format)
+        check_categories(request.categories)
+        check_mode(request.mode, request.categories)
         # print(f"starting analysis for url: {request.url}")  # debug
-        heuristics_data = run_heuristics(request.url)
-        # print(f"heuristics completed: {heuristics_data}")  # debug
-        
-        llm_analysis = await call_llm(heuristics_data, OPENAI_KEY)
-        # print(f"llm analysis: {llm_analysis}")  # debug
+        if wants_quick_audit(request):
+            result = {"url": request.url, "heuristics": await asyncio.to_thread(quick_audit, request.url, page_fetcher)}
+        else:
+            result = await coalesced_audit(request.url, request.categories, request.probe_assets)
+        return render(project_result(result, fields), accept=accept, format=format)
+    except Exception as error:
+        # print(f"error in analysis: {error}")  # debug
+        return render({"error": str(error)}, status_code=400, accept=accept, format=format)
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/analyze/stream")
+async def analyze_stream(request: AnalyzeRequest):
+    try:
+        check_categories(request.categories)
+        check_mode(request.mode, request.categories)
+    except ValueError as error:
+        return JSONResponse(status_code=400, content={"error": str(error)})
+
+    async def events():
+        try:
+            heuristics_data = await asyncio.to_thread(audit_page, request.url, request.categories,
+                                                      asset_prober if request.probe_assets else None)
+            yield sse_event("heuristics", {"url": request.url, "heuristics": heuristics_data})
+            if not OPENAI_KEY:
+                yield sse_event("report", "LLM not configured")
+            async for event in stream_llm(heuristics_data, OPENAI_KEY, report_cache):
+                yield sse_event(event["event"], event["data"])
+        except Exception as error:
+            yield sse_event("error", {"error": str(error)})
+        yield sse_event("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/api/compare")
+async def compare(request: CompareRequest, http_request: Request, format: str | None = None):
+    accept = http_request.headers.get("accept")
+    try:
+        check_format(format)
+    except ValueError as error:
+        return render({"error": str(error)}, status_code=400)
+    urls = list(dict.fromkeys(request.urls))
+    max_urls = int(os.getenv("COMPARE_MAX_URLS", "6"))
+    if not 2 <= len(urls) <= max_urls:
+        return render({"error": f"compare takes 2 to {max_urls} distinct urls"}, status_code=400, accept=accept, format=format)
+    try:
+        check_categories(request.categories)
+    except ValueError as error:
+        return render({"error": str(error)}, status_code=400, accept=accept, format=format)
 
+    async def analyze_one(url):
+        try:
+            return {"url": url, "heuristics": await asyncio.to_thread(audit_page, url, request.categories)}
+        except Exception as error:
+            return {"url": url, "error": str(error)}
+
+    results = await asyncio.gather(*[analyze_one(url) for url in urls])
+    if "error" in results[0]:
+        return render({"error": f"baseline {urls[0]}: {results[0]['error']}"}, status_code=400, accept=accept, format=format)
+    comparison = build_comparison(results)
+    try:
+        # one report over the score deltas and differing signals instead of a full report per page
+        llm_analysis = await call_comparison_llm(comparison, OPENAI_KEY)
+    except Exception as error:
+        llm_analysis = {"error": str(error)}
+    return render({**comparison, "llm_report": parse_report(llm_analysis) or "LLM not configured"},
+                  accept=accept, format=format)
+
+@app.post("/api/crawl")
+async def crawl(request: CrawlRequest):
+    try:
+        results = await asyncio.to_thread(
+            lambda: list(crawl_domain(request.domain, crawl_page, frontier, politeness, request.max_pages))
+        )
         return {
-            "url": request.url,
-            "heuristics": heuristics_data,
-            "llm_report": llm_analysis or "LLM not configured"
+            "domain": request.domain,
+            "results": results,
+            "frontier": frontier.counts(normalize_domain(request.domain))
         }
     except Exception as error:
-        # print(f"error in analysis: {error}")  # debug
         return JSONResponse(status_code=400, content={"error": str(error)})
 
+@app.post("/api/jobs")
+async def create_job(request: JobRequest):
+    if request.url:
+        job_id = job_queue.submit("audit", {"url": request.url}, total=1)
+    elif request.urls:
+        urls = list(dict.fromkeys(request.urls))
+        job_id = job_queue.submit("batch", {"urls": urls}, total=len(urls))
+    elif request.domain:
+        job_id = job_queue.submit("crawl", {"domain": request.domain, "max_pages": request.max_pages},
+                                  total=request.max_pages)
+    else:
+        return JSONResponse(status_code=400, content={"error": "one of url, urls or domain is required"})
+    return JSONResponse(status_code=202, content={"id": job_id, "status": "queued"})
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str, http_request: Request, format: str | None = None):
+    accept = http_request.headers.get("accept")
+    job = job_queue.get(job_id)
+    if not job:
+        return render({"error": "job not found"}, status_code=404, accept=accept, format=format)
+    return render(job, accept=accept, format=format)
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "worker_pid": os.getpid(),
+        "loop_lag": loop_lag.stats(),
+        "inflight": inflight.stats(),
+        "llm_cache": report_cache.stats(),
+        "llm_batches": llm_batcher.stats(),
+        "asset_probes": asset_prober.stats(),
+        "html_archive": html_archive.stats() if html_archive else None,
+        "fetch_latency": page_fetcher.stats(),
+        "crawl_fetch_latency": crawl_fetcher.stats()
+    }
+
 @app.get("/health")
 def health():
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field, fields
+
+TRUST_INDICATOR_KEYS = [
+    "security_badges", "compliance_mentions", "effective_trust_badges", "guarantees", "client_logos",
+    "trust_badges", "compliance", "awards", "numbers", "payment_integrations", "payment_buttons"
+]
+HEADING_KEYS = [f"h{i}_count" for i in range(1, 7)]
+SCORE_KEYS = [
+    "value_proposition_clarity", "cta_effectiveness", "trust_social_proof", "visual_imagery",
+    "mobile_accessibility", "technical_performance", "user_experience", "conversion_optimization", "overall_score"
+]
+NESTED_KEYS = {"trust_indicators": TRUST_INDICATOR_KEYS, "headings": HEADING_KEYS, "conversion_scores": SCORE_KEYS}
+
+
+@dataclass(slots=True)
+class HeuristicsResult:
+    """fixed-field heuristics for one page; defaults match what scoring assumes when a signal is missing.
+    only fields set through from_dict or update are emitted, so extractors that did not run leave no defaults behind"""
+    site_type: str = "generic"
+    page_type: str = "unknown"
+
+    availability: str | None = None
+    product_image_count: int = 0
+    structured_data_sources: list = field(default_factory=list)
+
+    title: str = ""
+    h1: str = ""
+    price: str = ""
+    is_free_product: bool = False
+
+    cta: str | None = None
+    price_near_cta: bool = False
+    cta_above_fold: bool = False
+    shipping_returns_near_cta: bool = False
+
+    image_count: int = 0
+    images_missing_alt: int = 0
+    alt_coverage: float = 0.0
+
+    testimonials: int = 0
+    has_reviews_or_ratings: bool = False
+    average_rating: float | None = None
+
+    security_badges: int = 0
+    guarantees: int = 0
+    trust_text_hits: int = 0
+    client_logos: int = 0
+    trust_badges: int = 0
+    social_proof: int = 0
+    trust_indicators: dict = field(default_factory=dict)
+
+    form_count: int = 0
+    form_fields: int = 0
+    popup_count: int = 0
+    headings: dict = field(default_factory=dict)
+    viewport_present: bool = False
+    meta_title_len: int = 0
+    meta_description_len: int = 0
+    og_tags_present: bool = False
+    canonical_present: bool = False
+    breadcrumbs_present: bool = False
+    related_products_present: bool = False
+    has_search: bool = False
+    html_bytes: int = 0
+    external_script_count: int = 0
+    inline_script_count: int = 0
+    a11y_unlabeled_buttons: int = 0
+    a11y_unlabeled_links: int = 0
+
+    page_weight_bytes: int = 0
+    asset_bytes: int = 0
+    assets_probed: int = 0
+    assets_unsized: int = 0
+    largest_assets: list = field(default_factory=list)
+
+    heading_hierarchy: list = field(default_factory=list)
+    h1_count: int = 0
+    has_subheadings: bool = False
+    max_dom_depth: int = 0
+    section_count: int = 0
+    main_present: bool = False
+    cta_grouping: bool = False
+    cta_position: int | None = None
+    gallery_present: bool = False
+    modals_with_cta: bool = False
+
+    conversion_scores: dict = field(default_factory=dict)
+
+    # bit i set when FIELD_NAMES[i] was assigned; one int per result instead of a set of names
+    assigned: int = field(default=0, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HeuristicsResult":
+        values = {name: data[name] for name in FIELD_NAMES if name in data}
+        result = cls(**values)
+        result.assigned = field_mask(values)
+        return result
+
+    def update(self, values: dict):
+        unknown = [name for name in values if name not in FIELD_SET]
+        if unknown:
+            raise ValueError(f"unknown heuristics fields: {', '.join(unknown)}")
+        for name, value in values.items():
+            setattr(self, name, value)
+        self.assigned |= field_mask(values)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in FIELD_NAMES if self.assigned & FIELD_BITS[name]}
+
+    @staticmethod
+    def columns() -> list:
+        """flat column names: nested dicts are expanded, lists become counts, unset fields are None"""
+        return COLUMNS
+
+    def to_row(self) -> tuple:
+        row = []
+        for name in FIELD_NAMES:
+            value = getattr(self, name) if self.assigned & FIELD_BITS[name] else None
+            if name in NESTED_KEYS:
+                value = value or {}
+                row.extend(value.get(key) for key in NESTED_KEYS[name])
+            elif isinstance(value, list):
+                row.append(len(value))
+            else:
+                row.append(value)
+        return tuple(row)
+
+
+FIELD_NAMES = [f.name for f in fields(HeuristicsResult) if f.name != "assigned"]
+FIELD_SET = set(FIELD_NAMES)
+FIELD_BITS = {name: 1 << index for index, name in enumerate(FIELD_NAMES)}
+COLUMNS = [
+    column
+    for name in FIELD_NAMES
+    for column in ([f"{name}.{key}" for key in NESTED_KEYS[name]] if name in NESTED_KEYS else [name])
+]
+
+
+def field_mask(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= FIELD_BITS[name]
+    return mask
+
+
+def to_columns(results) -> dict:
+    """pivot many results into column lists for bulk re-scoring or dataframe export"""
+    rows = [result.to_row() for result in results]
+    return {column: [row[index] for row in rows] for index, column in enumerate(COLUMNS)}
@@ -0,0 +1,144 @@
+import codecs
+import time
+from html.parser import HTMLParser
+
+import requests
+
+from heuristic import SITE_TYPE_KEYWORDS, PAGE_TYPE_INDICATORS, classify_site_type, classify_page_type, calculate_conversion_scores
+from models import HeuristicsResult
+from fetch import USER_AGENT, Fetcher, default_fetcher
+
+QUICK_CATEGORIES = ["technical_performance"]
+MODES = ["full", "quick"]
+SCAN_KEYWORDS = sorted({keyword for keywords in [*SITE_TYPE_KEYWORDS.values(), *PAGE_TYPE_INDICATORS.values()]
+                        for keyword in keywords})
+KEYWORD_TAIL = max(len(keyword) for keyword in SCAN_KEYWORDS) - 1
+HIDDEN_TEXT_TAGS = {"script", "style", "template"}
+
+
+def check_mode(mode: str, categories=None):
+    """raise ValueError for an unknown mode, or for quick mode with categories the prescan cannot score"""
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode}; expected one of {', '.join(MODES)}")
+    unscored = [category for category in categories or [] if category not in QUICK_CATEGORIES]
+    if mode == "quick" and unscored:
+        raise ValueError(f"quick mode cannot score: {', '.join(unscored)}; it scores {', '.join(QUICK_CATEGORIES)}")
+
+
+class PreScanner(HTMLParser):
+    """single pass tokenizer over html as it downloads, collecting the signals that need no dom"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html_bytes = 0
+        self.viewport_present = False
+        self.meta_description_len = 0
+        self.og_tags_present = False
+        self.canonical_present = False
+        self.external_script_count = 0
+        self.inline_script_count = 0
+        self.title_parts = None
+        self.title = None
+        self.hidden_depth = 0
+        self.text_tail = ""
+        self.found_keywords = set()
+
+    def feed_text(self, text: str):
+        self.html_bytes += len(text.encode("utf-8"))
+        self.feed(text)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta":
+            name = (attrs.get("name") or "").lower()
+            if name == "viewport":
+                self.viewport_present = True
+            elif name == "description" and not self.meta_description_len:
+                self.meta_description_len = len((attrs.get("content") or "").strip())
+            if attrs.get("property") in ("og:title", "og:description"):
+                self.og_tags_present = True
+        elif tag == "link":
+            if "canonical" in (attrs.get("rel") or "").lower().split():
+                self.canonical_present = True
+        elif tag == "script":
+            if attrs.get("src"):
+                self.external_script_count += 1
+            else:
+                self.inline_script_count += 1
+        elif tag == "title" and self.title is None:
+            self.title_parts = []
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self.title_parts is not None:
+            self.title = "".join(self.title_parts).strip()
+            self.title_parts = None
+        if tag in HIDDEN_TEXT_TAGS and self.hidden_depth:
+            self.hidden_depth -= 1
+
+    def handle_data(self, data):
+        if self.title_parts is not None:
+            self.title_parts.append(data)
+        if self.hidden_depth:
+            return
+        # keep a tail so phrases split across chunks or elements still match, like get_text() would
+        window = self.text_tail + data.lower()
+        self.found_keywords.update(keyword for keyword in SCAN_KEYWORDS if keyword in window)
+        self.text_tail = window[-KEYWORD_TAIL:]
+
+    def to_result(self) -> HeuristicsResult:
+        return HeuristicsResult.from_dict({
+            "site_type": classify_site_type(self.found_keywords),
+            "page_type": classify_page_type(self.found_keywords),
+            "title": self.title or "",
+            "viewport_present": self.viewport_present,
+            "meta_title_len": len(self.title or ""),
+            "meta_description_len": self.meta_description_len,
+            "og_tags_present": self.og_tags_present,
+            "canonical_present": self.canonical_present,
+            "html_bytes": self.html_bytes,
+            "external_script_count": self.external_script_count,
+            "inline_script_count": self.inline_script_count
+        })
+
+
+def prescan_document(html: str) -> HeuristicsResult:
+    """prescan html that is already in memory"""
+    scanner = PreScanner()
+    scanner.feed_text(html)
+    scanner.close()
+    return scanner.to_result()
+
+
+def quick_audit(url: str, fetcher: Fetcher | None = None) -> dict:
+    """stream a page through the prescanner and score what needs no dom"""
+    fetcher = fetcher or default_fetcher
+    started = time.perf_counter()
+    scanner = PreScanner()
+    try:
+        response = requests.get(url, timeout=fetcher.timeouts(url), headers={"User-Agent": USER_AGENT}, stream=True)
+    except requests.RequestException as failure:
+        fetcher.record_failure(url, failure, started)
+        raise
+    fetcher.record(url, time.perf_counter() - started)
+    with response:
+        response.raise_for_status()
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        for chunk in response.iter_content(chunk_size=16384):
+            scanner.feed_text(decoder.decode(chunk))
+        scanner.feed_text(decoder.decode(b"", final=True))
+    scanner.close()
+
+    return quick_scores(scanner.to_result(), started)
+
+
+def quick_scores(result: HeuristicsResult, started: float) -> dict:
+    result.update({"conversion_scores": calculate_conversion_scores(result, QUICK_CATEGORIES)})
+    return {**result.to_dict(), "mode": "quick", "scan_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def quick_audit_document(html: str) -> dict:
+    """quick audit of html that is already in memory"""
+    started = time.perf_counter()
+    return quick_scores(prescan_document(html), started)
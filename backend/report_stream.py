@@ -0,0 +1,129 @@
+import json
+
+STREAMED_KEYS = ["summary", "score_analysis", "top_issues", "quick_wins", "copy_suggestions"]
+ACTION_FIELDS = {"action": str, "why": str, "impact": int, "confidence": int, "effort": int}
+
+
+def validate_section(key: str, value):
+    """check a top-level report section against the prompt schema, returning (value, error)"""
+    if key == "summary":
+        return (value, None) if isinstance(value, str) else (None, "summary must be a string")
+    if key == "score_analysis":
+        if not isinstance(value, dict):
+            return None, "score_analysis must be an object"
+        return {name: [item for item in value.get(name, []) if isinstance(item, str)]
+                for name in ["strengths", "weaknesses"]}, None
+    if not isinstance(value, list):
+        return None, f"{key} must be a list"
+    return [item for item in value if isinstance(item, (str, dict))], None
+
+
+def validate_action(item):
+    """check one prioritized_actions entry, returning (action, error)"""
+    if not isinstance(item, dict):
+        return None, "action must be an object"
+    action = {}
+    for field, field_type in ACTION_FIELDS.items():
+        value = item.get(field)
+        if field_type is int:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or int(value) != value:
+                return None, f"{field} must be an integer"
+            if not 1 <= value <= 3:
+                return None, f"{field} must be in 1..3"
+            value = int(value)
+        elif not isinstance(value, str) or not value.strip():
+            return None, f"{field} must be a non-empty string"
+        action[field] = value
+    return action, None
+
+
+class ReportStreamParser:
+    """incremental json scanner that emits report sections as soon as each one is complete"""
+
+    def __init__(self):
+        self.buffer = []
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.expecting_key = False
+        self.key_start = None
+        self.current_key = None
+        self.value_start = None
+        self.item_start = None
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        for char in chunk:
+            index = self.position
+            self.buffer.append(char)
+            self.position += 1
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key_start is not None:
+                        self.current_key = json.loads(self._text(self.key_start, index + 1))
+                        self.key_start = None
+                    elif self.depth == 1 and self.value_start is not None:
+                        events += self._finish_value(index + 1)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expecting_key:
+                    self.key_start = index
+                    self.expecting_key = False
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.expecting_key = True
+                elif self.depth == 3 and char == "{" and self.current_key == "prioritized_actions":
+                    self.item_start = index
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0 and self.value_start is not None:
+                    events += self._finish_value(index)
+                elif self.depth == 1 and self.value_start is not None:
+                    events += self._finish_value(index + 1)
+                elif self.depth == 2 and self.item_start is not None:
+                    item, error = validate_action(self._load(self.item_start, index + 1))
+                    self.item_start = None
+                    events.append({"event": "prioritized_action", "data": item} if item
+                                  else {"event": "invalid", "data": {"section": "prioritized_actions", "error": error}})
+            elif self.depth == 1:
+                if char == ":":
+                    self.value_start = index + 1
+                elif char == ",":
+                    if self.value_start is not None:
+                        events += self._finish_value(index)
+                    self.expecting_key = True
+        return events
+
+    def _text(self, start: int, end: int) -> str:
+        return "".join(self.buffer[start:end])
+
+    def _load(self, start: int, end: int):
+        try:
+            return json.loads(self._text(start, end))
+        except ValueError:
+            return None
+
+    def _finish_value(self, end: int) -> list:
+        key, start = self.current_key, self.value_start
+        self.value_start = None
+        self.current_key = None
+        if key not in STREAMED_KEYS:
+            return []
+        value, error = validate_section(key, self._load(start, end))
+        if error:
+            return [{"event": "invalid", "data": {"section": key, "error": error}}]
+        return [{"event": key, "data": value}]
+
+    def result(self):
+        """the full report once the stream is complete, or None if it is not valid json"""
+        return self._load(0, len(self.buffer))
@@ -0,0 +1,88 @@
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPES = ["application/msgpack", "application/x-msgpack"]
+FORMATS = ["json", "msgpack"]
+
+
+def parse_report(llm_report):
+    """decode an llm report string into json so it is not double-encoded"""
+    if not isinstance(llm_report, str):
+        return llm_report
+    try:
+        return json.loads(llm_report)
+    except ValueError:
+        return llm_report
+
+
+def project(data: dict, fields: list) -> dict:
+    """keep only the requested dotted paths, e.g. conversion_scores or trust_indicators.guarantees"""
+    projected = {}
+    for field in fields:
+        parts = field.split(".")
+        source = data
+        for part in parts:
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = source
+    return projected
+
+
+def project_result(result: dict, fields: str | None) -> dict:
+    """apply a comma-separated fields= projection to an analysis result"""
+    if not fields:
+        return result
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    top_level = [field for field in requested if field in ("url", "llm_report", "error")]
+    projected = {field: result[field] for field in top_level if field in result}
+    heuristic_fields = [field for field in requested if field not in top_level]
+    if heuristic_fields and "heuristics" in result:
+        projected["heuristics"] = project(result["heuristics"], heuristic_fields)
+    return projected
+
+
+def dumps(content) -> bytes:
+    if orjson:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def check_format(format: str | None):
+    """raise ValueError for a format= value other than json or msgpack"""
+    if format is not None and format not in FORMATS:
+        raise ValueError(f"unknown format: {format}; expected one of {', '.join(FORMATS)}")
+
+
+def wants_msgpack(accept: str | None, format: str | None) -> bool:
+    if format:
+        return format == "msgpack"
+    return any(media_type in (accept or "") for media_type in MSGPACK_TYPES)
+
+
+def render(content, status_code: int = 200, accept: str | None = None, format: str | None = None) -> Response:
+    """encode straight to bytes, skipping fastapi's jsonable_encoder pass"""
+    try:
+        check_format(format)
+    except ValueError as error:
+        return Response(dumps({"error": str(error)}), status_code=400, media_type="application/json")
+    if wants_msgpack(accept, format):
+        if msgpack is None:
+            return Response(dumps({"error": "msgpack is not installed"}), status_code=406, media_type="application/json")
+        return Response(msgpack.packb(content, use_bin_type=True), status_code=status_code,
+                        media_type="application/msgpack")
+    return Response(dumps(content), status_code=status_code, media_type="application/json")
@@ -0,0 +1,36 @@
+import asyncio
+
+
+def _retrieve_exception(task):
+    # if every waiter was cancelled nobody else reads the error, and asyncio would log it as never retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """share one in-flight computation between concurrent callers with the same key"""
+
+    def __init__(self):
+        self.calls = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn):
+        task = self.calls.get(key)
+        if task:
+            self.shared += 1
+        else:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+            task.add_done_callback(_retrieve_exception)
+        # one caller disconnecting must not cancel the work the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self.calls),
+            "started": self.started,
+            "shared": self.shared
+        }
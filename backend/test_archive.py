@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import logging
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from archive import HtmlArchive, rescore
+from heuristic import analyze_page
+
+PAGE = """<html><head><title>Archived truffle box product page</title></head>
+<body><h1>Truffle Box</h1><p>$24.00</p><button>Add to cart</button></body></html>""".encode("utf-8")
+
+def test_archive():
+    archive = HtmlArchive(tempfile.mkdtemp())
+    first = archive.put("https://shop.test/p/truffles", PAGE, "utf-8", fetched_at=1)
+    second = archive.put("https://shop.test/p/truffles?ref=home", PAGE, "utf-8", fetched_at=2)
+    archive.put("https://shop.test/p/truffles", PAGE.replace(b"$24.00", b"$26.00"), "utf-8", fetched_at=3)
+
+    stats = archive.stats()
+    print("Stats:", stats)
+    assert first == second
+    assert stats["fetches"] == 3 and stats["urls"] == 2 and stats["blobs"] == 2
+    assert archive.read(first) == PAGE
+
+    latest = list(rescore(archive))
+    print("Latest:", [(row["url"], row["heuristics"]["price"]) for row in latest])
+    assert [row["heuristics"]["price"] for row in latest] == ["$26.00", "$24.00"]
+    assert len(list(rescore(archive, latest=False))) == 3
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+def test_archive_failure_does_not_fail_audit():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    archive = HtmlArchive(tempfile.mkdtemp())
+    archive.db.close()
+    logging.disable(logging.WARNING)
+    try:
+        result = analyze_page(f"http://127.0.0.1:{server.server_port}/p/truffles", archive=archive)
+    finally:
+        logging.disable(logging.NOTSET)
+        server.shutdown()
+    assert result.price == "$24.00"
+
+if __name__ == "__main__":
+    test_archive()
+    test_archive_failure_does_not_fail_audit()
+    print("HTML archive works")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from bs4 import BeautifulSoup
+
+from assets import AssetProber, collect_asset_urls
+from heuristic import analyze_document
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def do_HEAD(self):
+        host = self.headers["Host"]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(1)
+            elif self.path.startswith("/busy"):
+                time.sleep(0.3)
+            super().do_HEAD()
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+PAGE = """<html><head><title>Asset weight test page</title>
+<link rel="stylesheet" href="/site.css"><script src="/app.js"></script></head>
+<body><h1>Product</h1><img src="/hero.jpg" alt="hero"><img src="hero.jpg" alt="again">
+<img src="data:image/png;base64,AAAA"><img src="/slow.jpg" alt="slow"></body></html>"""
+
+def test_asset_probing():
+    root = tempfile.mkdtemp()
+    for name, size in [("site.css", 2000), ("app.js", 50000), ("hero.jpg", 300000), ("slow.jpg", 10)]:
+        with open(os.path.join(root, name), "wb") as file:
+            file.write(b"x" * size)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(StaticHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/product.html"
+
+    try:
+        assets = collect_asset_urls(BeautifulSoup(PAGE, "html.parser"), base_url)
+        print("Assets:", assets)
+        assert [kind for _, kind in assets] == ["image", "image", "script", "stylesheet"]
+
+        prober = AssetProber(workers=4, per_host=2, deadline=0.5)
+        started = time.perf_counter()
+        result = analyze_document(PAGE, url=base_url, prober=prober)
+        elapsed = time.perf_counter() - started
+        print("Weight:", result.page_weight_bytes, "largest:", result.largest_assets, f"{elapsed:.2f}s")
+        assert elapsed < 1
+        assert result.asset_bytes == 352000
+        assert result.assets_probed == 3 and result.assets_unsized == 1
+        assert result.largest_assets[0]["url"].endswith("/hero.jpg")
+        assert result.page_weight_bytes == result.html_bytes + 352000
+
+        # same store, second page: sizes come from the cache
+        analyze_document(PAGE, url=base_url, prober=prober)
+        print("Stats:", prober.stats())
+        assert prober.stats()["cache"]["hits"] >= 3
+
+        assert analyze_document(PAGE).page_weight_bytes == 0
+        # nothing sized before the deadline: performance is scored on the html tiers, not html_bytes alone
+        unsized = analyze_document(PAGE, ["technical_performance"], url=base_url,
+                                   prober=AssetProber(deadline=0))
+        assert unsized.assets_probed == 0 and unsized.page_weight_bytes == unsized.html_bytes
+        assert unsized.conversion_scores == analyze_document(PAGE, ["technical_performance"]).conversion_scores
+    finally:
+        server.shutdown()
+
+def test_per_host_lanes():
+    # one busy host gets per_host lanes, so another host's asset is not queued behind it
+    root = tempfile.mkdtemp()
+    for name in ["busy.jpg", "logo.png"]:
+        with open(os.path.join(root, name), "wb") as file:
+            file.write(b"x" * 100)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(StaticHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    busy_host, other_host = f"127.0.0.1:{server.server_port}", f"localhost:{server.server_port}"
+
+    try:
+        prober = AssetProber(workers=4, per_host=2, deadline=0.8)
+        urls = [f"http://{busy_host}/busy.jpg?{index}" for index in range(8)] + [f"http://{other_host}/logo.png"]
+        sizes = prober.sizes(urls)
+        print("Peak per host:", StaticHandler.peak, "stats:", prober.stats())
+        assert sizes[f"http://{other_host}/logo.png"] == 100
+        assert StaticHandler.peak[busy_host] <= 2
+        assert 2 <= sum(size is not None for size in sizes.values()) < len(urls)
+        assert prober.stats()["hosts"] == 2
+
+        # concurrent pages from one store share the host's lanes instead of opening per_host each
+        time.sleep(0.5)
+        StaticHandler.peak.clear()
+        prober = AssetProber(workers=16, per_host=2, deadline=2)
+        pages = [[f"http://{busy_host}/busy.jpg?page={page}&asset={index}" for index in range(3)] for page in range(4)]
+        threads = [threading.Thread(target=prober.sizes, args=(urls,)) for urls in pages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print("Concurrent pages peak:", StaticHandler.peak, "stats:", prober.stats())
+        assert StaticHandler.peak[busy_host] <= 2
+        assert prober.stats()["probed"] == 12
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_asset_probing()
+    test_per_host_lanes()
+    print("Asset probing works")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from cli import audit_many, main
+
+PAGE = """<html><head><title>Assorted Chocolate Truffle Box | Socola</title>
+<meta name="viewport" content="width=device-width"></head><body><main>
+<h1>Assorted Chocolate Truffle Box</h1><p>$49.00</p><button>Add to cart</button>
+<p>Free shipping and returns. {padding}</p></main></body></html>"""
+
+def write_corpus(count: int) -> list:
+    root = tempfile.mkdtemp()
+    paths = []
+    for index in range(count):
+        path = os.path.join(root, f"page-{index}.html")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(PAGE.format(padding="truffle praline ganache " * 8000 * index))
+        paths.append(path)
+    return paths
+
+def test_ndjson_and_exit_status():
+    paths = write_corpus(3)
+    listing = os.path.join(os.path.dirname(paths[0]), "targets.txt")
+    with open(listing, "w") as file:
+        file.write("# local pages\n" + "\n".join(paths + ["missing.html"]) + "\n")
+    completed = subprocess.run([sys.executable, "-m", "cli", "-i", listing, "--workers", "2"],
+                               capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    lines = [json.loads(line) for line in completed.stdout.splitlines()]
+    print("CLI lines:", [(line["input"][-11:], "error" in line) for line in lines])
+    assert completed.returncode == 1
+    assert sorted(line["input"] for line in lines) == sorted(paths + ["missing.html"])
+    for line in lines:
+        assert ("error" in line) == (line["input"] == "missing.html") and line["elapsed_ms"] >= 0
+    assert all(line["heuristics"]["cta"] == "Add to cart" for line in lines if "heuristics" in line)
+
+def test_quick_scan_time():
+    # scan_ms covers the prescan itself, so a large page cannot report ~0
+    path = write_corpus(3)[2]
+    result = next(audit_many([path], workers=1, quick=True))
+    print("Quick scan:", result["heuristics"]["scan_ms"], "ms of", result["elapsed_ms"], "ms")
+    assert result["heuristics"]["mode"] == "quick"
+    assert result["heuristics"]["scan_ms"] > 1
+    assert result["heuristics"]["scan_ms"] <= result["elapsed_ms"]
+
+def test_lazy_imports():
+    # the cli and its argument parsing load neither the api server nor the llm client
+    code = ("import sys, cli; cli.main(['--input', '/dev/null']); "
+            "print(sorted(name for name in ('openai', 'fastapi', 'bs4', 'heuristic', 'main') if name in sys.modules))")
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert completed.stdout.strip() == "[]", completed.stdout + completed.stderr
+    assert main(["--input", "/dev/null"]) == 0
+
+if __name__ == "__main__":
+    test_ndjson_and_exit_status()
+    test_quick_scan_time()
+    test_lazy_imports()
+    print("CLI works")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+from compare import build_comparison
+
+def page(url, cta_score, cta_above_fold):
+    return {"url": url, "heuristics": {
+        "site_type": "ecommerce", "cta": "Add to cart", "cta_above_fold": cta_above_fold,
+        "conversion_scores": {"cta_effectiveness": cta_score, "overall_score": cta_score / 2}
+    }}
+
+def test_comparison():
+    comparison = build_comparison([
+        page("https://client.test/p", 4, False),
+        page("https://rival.test/p", 9, True),
+        {"url": "https://down.test/p", "error": "503 Server Error"}
+    ])
+    print("Comparison:", comparison)
+    rival, down = comparison["competitors"]
+    assert rival["deltas"] == {"cta_effectiveness": 5, "overall_score": 2.5}
+    assert rival["signal_diff"] == {"cta_above_fold": [False, True]}
+    assert down == {"url": "https://down.test/p", "error": "503 Server Error"}
+    assert comparison["leaders"]["cta_effectiveness"] == "https://rival.test/p"
+    assert "conversion_scores" not in comparison["baseline"]["signals"]
+
+if __name__ == "__main__":
+    test_comparison()
+    print("Comparison works")
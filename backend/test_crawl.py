@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl import Frontier, Politeness, crawl_domain, iter_sitemap
+
+def urlset(urls):
+    entries = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+class SitemapHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    base = ""
+
+    def do_GET(self):
+        base = SitemapHandler.base
+        chunked = False
+        if self.path == "/robots.txt":
+            body = f"User-agent: *\nDisallow: /products/secret\nSitemap: {base}/sitemap_index.xml\n".encode()
+        elif self.path == "/sitemap_index.xml":
+            body = (f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    f"<sitemap><loc>{base}/sitemap_products.xml.gz</loc></sitemap>"
+                    f"<sitemap><loc>{base}/sitemap_more.xml</loc></sitemap>"
+                    f"<sitemap><loc>{base}/sitemap_blogs.xml</loc></sitemap></sitemapindex>").encode()
+        elif self.path == "/sitemap_products.xml.gz":
+            urls = [f"{base}/products/item-{i}" for i in range(20000)] + [f"{base}/products/secret", f"{base}/pages/about"]
+            body = gzip.compress(urlset(urls))
+        elif self.path == "/sitemap_more.xml":
+            body, chunked = urlset([f"{base}/products/extra-{i}" for i in range(5)]), True
+        elif self.path.startswith("/products/"):
+            body = b"<html><title>product</title></html>"
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 100):
+                piece = body[start:start + 100]
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_crawl():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SitemapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = SitemapHandler.base = f"http://127.0.0.1:{server.server_port}"
+    frontier_path = os.path.join(tempfile.mkdtemp(), "frontier.db")
+
+    try:
+        assert len(list(iter_sitemap(f"{base}/sitemap_more.xml"))) == 5
+        assert len(list(iter_sitemap(f"{base}/sitemap_products.xml.gz"))) == 20002
+
+        frontier = Frontier(frontier_path)
+        audited = []
+        results = list(crawl_domain(base, lambda url: audited.append(url) or {"url": url}, frontier, Politeness(0), 3))
+        counts = frontier.counts(f"127.0.0.1:{server.server_port}")
+        print("Results:", results)
+        print("Frontier:", counts)
+        assert len(results) == 3 and all("heuristics" in result for result in results)
+        assert counts == {"done": 3, "pending": 20002}
+        sitemaps = dict(frontier.db.execute("SELECT url, status FROM sitemaps").fetchall())
+        assert sitemaps[f"{base}/sitemap_products.xml.gz"] == "done"
+        assert f"{base}/sitemap_blogs.xml" not in sitemaps
+        assert not any("secret" in url or "/pages/" in url for url in audited)
+
+        # a second run resumes from the frontier instead of re-reading the sitemaps
+        more = list(crawl_domain(base, lambda url: {"url": url}, frontier, Politeness(0), 2))
+        assert len(more) == 2 and not {result["url"] for result in more} & set(audited)
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_crawl()
+    print("Sitemap crawl works")
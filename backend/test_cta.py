@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+from bs4 import BeautifulSoup
+
+from heuristic import extract_cta_info, locate_cta, summarize_structure
+
+SAAS_KEYWORDS = {"cta": ["get started"]}
+
+def soup_of(html):
+    return BeautifulSoup(html, "html.parser")
+
+def test_earlier_phrase_beats_element_type():
+    # a span/div with an earlier phrase wins over a clickable with a later one
+    soup = soup_of('<a href="/">Home</a><button>Learn more</button><div role="button">Get started</div>')
+    cta = locate_cta(soup, SAAS_KEYWORDS)
+    print("Div CTA:", cta["text"], cta["position"])
+    assert cta["text"] == "Get started" and cta["node"].name == "div"
+    assert cta["position"] is None and cta["clickable_count"] == 2
+
+def test_clickable_wins_phrase_ties():
+    soup = soup_of('<div role="button">Get started</div><a href="/">Home</a><a href="/signup">Get started today</a>')
+    cta = locate_cta(soup, SAAS_KEYWORDS)
+    assert cta["node"].name == "a" and cta["text"] == "Get started today" and cta["position"] == 1
+
+def test_non_interactive_and_excluded_candidates():
+    # plain divs and skip links are not ctas; data-cta labels are
+    soup = soup_of('<a href="#main">Skip to content</a><div>Buy now</div>'
+                   '<span onclick="go()">Learn more</span><a data-cta="buy now" href="/p"><svg></svg></a>')
+    cta = locate_cta(soup)
+    assert cta["node"].name == "span" and cta["text"] == "Learn more"
+    assert locate_cta(soup_of('<div>Buy now</div><a href="#main">Skip to content</a>'))["node"] is None
+
+def test_cta_info_and_structure_share_the_pick():
+    html = ('<main><h1>Assorted Truffle Box</h1><div class="buy"><p>$49.00</p><button>Add to cart</button>'
+            '<p>Free shipping and returns</p></div>'
+            '<div class="modal"><p>Join our list</p><a href="/s">Subscribe</a></div></main>')
+    soup = soup_of(html)
+    cta = locate_cta(soup, {"cta": ["add to cart"]})
+    info = extract_cta_info(soup, {"cta": ["add to cart"]}, cta)
+    structure = summarize_structure(soup, cta)
+    print("CTA info:", info)
+    assert info == {"cta": "Add to cart", "price_near_cta": True, "cta_above_fold": True,
+                    "shipping_returns_near_cta": True}
+    assert structure["cta_position"] == 0 and structure["cta_grouping"]
+    assert structure["modals_with_cta"]
+
+if __name__ == "__main__":
+    test_earlier_phrase_beats_element_type()
+    test_clickable_wins_phrase_ties()
+    test_non_interactive_and_excluded_candidates()
+    test_cta_info_and_structure_share_the_pick()
+    print("CTA picker works")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+from heuristic import SCORE_CATEGORIES, analyze_document, build_extraction_plan
+
+PRODUCT_PAGE = """<html><head><title>Truffle Box | Socola Chocolates</title></head><body><main>
+<h1>Assorted Truffle Box</h1><p>$49.00</p><button>Add to cart</button>
+<p>Quantity, size and color options. In stock, free shipping and returns.</p>
+<p>"The best truffles I have ever had, bought them twice."</p></main></body></html>"""
+
+HOMEPAGE = """<html><head><title>Acme Cloud - the platform for teams</title></head><body>
+<h1>Welcome to Acme</h1><p>About us, our story, our team and mission. Blog, careers, contact and support.</p>
+<a href="/signup">Get started</a>
+<p>"Acme cut our reporting time in half within a month." - Jane Doe, CEO</p></body></html>"""
+
+def test_plan_selection():
+    plan = build_extraction_plan("ecommerce", "product", ["cta_effectiveness"])
+    names = [extractor["name"] for extractor in plan]
+    print("CTA plan:", names)
+    assert names == ["cta"]
+    full = build_extraction_plan("ecommerce", "product", SCORE_CATEGORIES)
+    assert [extractor["cost"] for extractor in full] == sorted(extractor["cost"] for extractor in full)
+    assert "asset_weight" not in [extractor["name"] for extractor in full]
+    assert "testimonial_fallbacks" not in [extractor["name"] for extractor in
+                                           build_extraction_plan("saas", "homepage", SCORE_CATEGORIES)]
+
+def test_category_subset():
+    result = analyze_document(PRODUCT_PAGE, ["cta_effectiveness", "trust_social_proof"])
+    print("Subset scores:", result.conversion_scores)
+    assert set(result.conversion_scores) == {"cta_effectiveness", "trust_social_proof", "overall_score"}
+    assert result.cta == "Add to cart"
+
+def test_unknown_categories():
+    try:
+        analyze_document(PRODUCT_PAGE, ["bogus"])
+    except ValueError as error:
+        assert "bogus" in str(error)
+    else:
+        raise AssertionError("unknown categories must be rejected")
+
+def test_testimonial_fallbacks_by_page_type():
+    # the text-scanning fallbacks only run on product/category/unknown pages; homepage quotes are not counted
+    product = analyze_document(PRODUCT_PAGE)
+    homepage = analyze_document(HOMEPAGE)
+    print("Testimonials:", product.page_type, product.testimonials, "/", homepage.page_type, homepage.testimonials)
+    assert product.page_type == "product" and product.testimonials == 1
+    assert homepage.page_type == "homepage" and homepage.testimonials == 0
+
+if __name__ == "__main__":
+    test_plan_selection()
+    test_category_subset()
+    test_unknown_categories()
+    test_testimonial_fallbacks_by_page_type()
+    print("Extraction plan works")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from fetch import Fetcher
+
+class StallingHandler(BaseHTTPRequestHandler):
+    requests_seen = 0
+    stall_next = 0
+    slow_body = 0
+
+    def do_GET(self):
+        StallingHandler.requests_seen += 1
+        if StallingHandler.stall_next:
+            stall, StallingHandler.stall_next = StallingHandler.stall_next, 0
+            time.sleep(stall)
+        body = b"<html><title>ok</title></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            if StallingHandler.slow_body:
+                self.wfile.flush()
+                time.sleep(StallingHandler.slow_body)
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on a stalled request
+            pass
+
+    def log_message(self, *args):
+        pass
+
+def test_hedged_fetch():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/product"
+
+    try:
+        fetcher = Fetcher(default_timeout=12, min_timeout=2, min_samples=10, hedge=True, hedge_ratio=0.5)
+        assert fetcher.timeouts(url)[1] == 12
+        for _ in range(10):
+            fetcher.fetch(url)
+        connect, read = fetcher.timeouts(url)
+        print("Learned timeouts:", connect, read)
+        assert read == 2
+        # warmup fetches run on the caller's thread and answer before the p95, so neither pool has started a thread
+        assert not fetcher.primaries._threads and not fetcher.executor._threads
+
+        # the first attempt stalls past the host's p95, so the hedge should answer first
+        StallingHandler.stall_next = 1.5
+        started = time.perf_counter()
+        response = fetcher.fetch(url)
+        elapsed = time.perf_counter() - started
+        stats = fetcher.stats()[f"127.0.0.1:{server.server_port}"]
+        print("Hedged fetch:", f"{elapsed:.2f}s", stats)
+        assert response.status_code == 200
+        assert elapsed < 1
+        assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    finally:
+        time.sleep(1.6)
+        server.shutdown()
+
+def test_timeouts_are_samples():
+    # a timeout counts at the deadline it hit, so a host that slowed down gets a longer deadline back
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/product"
+
+    try:
+        fetcher = Fetcher(default_timeout=12, min_timeout=0.2, min_samples=10, hedge=False)
+        for _ in range(10):
+            fetcher.fetch(url)
+        assert fetcher.timeouts(url)[1] == 0.2
+        StallingHandler.stall_next = 0.5
+        try:
+            fetcher.fetch(url)
+        except requests.Timeout:
+            pass
+        else:
+            raise AssertionError("the stalled fetch should time out")
+        stats = fetcher.stats()[f"127.0.0.1:{server.server_port}"]
+        print("After timeout:", stats)
+        assert stats["errors"] == 1 and stats["requests"] == 11
+        assert fetcher.timeouts(url)[1] >= 0.6
+    finally:
+        time.sleep(0.5)
+        server.shutdown()
+
+def test_samples_stop_at_headers():
+    # hedging is opt-in, and a slow body does not count against the host's latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/product"
+
+    try:
+        fetcher = Fetcher()
+        assert fetcher.primaries is None and fetcher.executor is None
+        StallingHandler.slow_body = 0.3
+        started = time.perf_counter()
+        for _ in range(3):
+            assert fetcher.fetch(url).text == "<html><title>ok</title></html>"
+        elapsed = time.perf_counter() - started
+        stats = fetcher.stats()[f"127.0.0.1:{server.server_port}"]
+        print("Slow bodies:", f"{elapsed:.2f}s", stats)
+        assert elapsed >= 0.9 and stats["p99"] < 0.2
+    finally:
+        StallingHandler.slow_body = 0
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_hedged_fetch()
+    test_timeouts_are_samples()
+    test_samples_stop_at_headers()
+    print("Hedged fetching works")
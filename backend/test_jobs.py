@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import asyncio
+import os
+import tempfile
+
+from jobs import JobQueue
+
+async def count_to(job, report):
+    for done in range(1, job["payload"]["n"] + 1):
+        await asyncio.sleep(0.01)
+        report(done, job["payload"]["n"], {"seen": done})
+    return {"seen": job["payload"]["n"]}
+
+async def explode(job, report):
+    raise RuntimeError("boom")
+
+async def wait_for(queue, job_id, status):
+    for _ in range(200):
+        if queue.get(job_id)["status"] == status:
+            return queue.get(job_id)
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {status}: {queue.get(job_id)}")
+
+def test_job_queue():
+    path = os.path.join(tempfile.mkdtemp(), "jobs.db")
+
+    async def run():
+        queue = JobQueue(path, {"count": count_to, "explode": explode}, workers=2, poll_interval=0.05)
+        await queue.start()
+        counted = queue.submit("count", {"n": 5}, total=5)
+        failed = queue.submit("explode", {})
+        done = await wait_for(queue, counted, "done")
+        error = await wait_for(queue, failed, "failed")
+        await queue.stop()
+        print("Done:", done["progress"], done["result"])
+        print("Failed:", error["error"])
+        assert done["progress"] == {"done": 5, "total": 5} and done["result"] == {"seen": 5}
+        assert error["error"] == "boom"
+        try:
+            queue.submit("unknown", {})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown job kinds must be rejected")
+
+        # a job left running by a process that died is queued again on the next start
+        stranded = queue.submit("count", {"n": 2}, total=2)
+        queue.db.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (stranded,))
+        queue.db.commit()
+        restarted = JobQueue(path, {"count": count_to, "explode": explode}, workers=1, poll_interval=0.05)
+        await restarted.start()
+        resumed = await wait_for(restarted, stranded, "done")
+        await restarted.stop()
+        assert resumed["result"] == {"seen": 2}
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_job_queue()
+    print("Job queue works")
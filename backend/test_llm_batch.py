@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm import LLMBatcher
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        pages = json.loads(re.search(r"PAGES:\n(.*)\n", prompt).group(1))
+        MockCompletionHandler.requests_seen.append(list(pages))
+        # pages titled "dropped" are left out of the answer, as a model sometimes does
+        reports = {key: {"summary": f"cta_effectiveness={page['conversion_scores']['cta_effectiveness']}"}
+                   for key, page in pages.items() if page.get("title") != "dropped"}
+        payload = json.dumps({
+            "id": "mock", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(reports)}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def test_batching():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    async def run():
+        batcher = LLMBatcher("test-key", batch_size=3, flush_interval=0.2, base_url=base_url)
+        pages = [{"url": f"page-{i}", "conversion_scores": {"cta_effectiveness": i}} for i in range(5)]
+        return await asyncio.gather(*[batcher.submit(page) for page in pages]), batcher.stats()
+
+    try:
+        reports, stats = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    print("Batches:", MockCompletionHandler.requests_seen)
+    print("Stats:", stats)
+    assert [len(batch) for batch in MockCompletionHandler.requests_seen] == [3, 2]
+    assert [json.loads(report)["summary"] for report in reports] == [f"cta_effectiveness={i}" for i in range(5)]
+
+def test_missing_page():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    async def run():
+        batcher = LLMBatcher("test-key", batch_size=2, flush_interval=0.2, base_url=base_url)
+        pages = [{"title": "kept", "conversion_scores": {"cta_effectiveness": 1}},
+                 {"title": "dropped", "conversion_scores": {"cta_effectiveness": 2}}]
+        return await asyncio.gather(*[batcher.submit(page) for page in pages], return_exceptions=True)
+
+    try:
+        kept, dropped = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    print("Missing page:", kept, repr(dropped))
+    assert json.loads(kept)["summary"] == "cta_effectiveness=1"
+    assert isinstance(dropped, ValueError) and "missing page p2" in str(dropped)
+
+if __name__ == "__main__":
+    test_batching()
+    test_missing_page()
+    print("LLM batching works")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import asyncio
+
+from llm import call_llm
+from llm_cache import ReportCache, signal_fingerprint
+
+PAGE = {
+    "site_type": "ecommerce", "page_type": "product", "price_near_cta": True, "cta_above_fold": True,
+    "conversion_scores": {"cta_effectiveness": 8.2, "trust_social_proof": 5.0, "overall_score": 6.6}
+}
+
+def with_scores(**scores):
+    return {**PAGE, "conversion_scores": {**PAGE["conversion_scores"], **scores}}
+
+def test_fingerprint_quantization():
+    base = signal_fingerprint(PAGE)
+    assert signal_fingerprint(with_scores(cta_effectiveness=7.9, overall_score=1.0)) == base
+    assert signal_fingerprint(with_scores(cta_effectiveness=9.0)) != base
+    assert signal_fingerprint({**PAGE, "price_near_cta": False}) != base
+    # non-prompt fields do not split the cache
+    assert signal_fingerprint({**PAGE, "url": "https://example.com/other", "title": "Other"}) == base
+    # coarser buckets merge more pages; granularity 0 keys on exact scores
+    assert signal_fingerprint(with_scores(cta_effectiveness=8.7), 2.5) == signal_fingerprint(PAGE, 2.5)
+    assert signal_fingerprint(with_scores(cta_effectiveness=8.1), 0) != signal_fingerprint(PAGE, 0)
+
+def test_lru_eviction_and_stats():
+    cache = ReportCache(max_entries=2)
+    cache.put("a", "report a")
+    cache.put("b", "report b")
+    assert cache.get("a") == "report a"
+    cache.put("c", "report c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "report a" and cache.get("c") == "report c"
+    cache.put("d", None)
+    stats = cache.stats()
+    print("Cache stats:", stats)
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1 and stats["hit_rate"] == 0.75
+
+def test_disabled_cache():
+    cache = ReportCache(max_entries=0)
+    cache.put("a", "report a")
+    assert cache.get("a") is None and cache.stats()["entries"] == 0
+
+def test_call_llm_serves_cached_report():
+    # a hit never reaches the api, so a placeholder key is enough
+    cache = ReportCache()
+    cache.put(cache.key(PAGE), '{"summary": "cached"}')
+    report = asyncio.run(call_llm(with_scores(cta_effectiveness=8.4), "placeholder", cache))
+    assert report == '{"summary": "cached"}' and cache.stats()["hits"] == 1
+
+if __name__ == "__main__":
+    test_fingerprint_quantization()
+    test_lru_eviction_and_stats()
+    test_disabled_cache()
+    test_call_llm_serves_cached_report()
+    print("LLM report cache works")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import tracemalloc
+
+from heuristic import analyze_document, calculate_conversion_scores
+from models import COLUMNS, HeuristicsResult, to_columns
+
+PRODUCT_PAGE = """<html><head><title>Truffle Box | Socola Chocolates</title></head><body><main>
+<h1>Assorted Truffle Box</h1><p>$49.00</p><button>Add to cart</button></main></body></html>"""
+
+def test_only_assigned_fields_are_emitted():
+    result = HeuristicsResult.from_dict({"site_type": "ecommerce", "title": "Truffles", "mode": "quick"})
+    result.update({"cta": None, "price_near_cta": False})
+    print("Assigned:", result.to_dict())
+    assert result.to_dict() == {"site_type": "ecommerce", "title": "Truffles", "cta": None, "price_near_cta": False}
+    # unset fields still read as the scoring defaults
+    assert result.testimonials == 0 and result.page_type == "unknown"
+
+def test_unknown_update_keys():
+    result = HeuristicsResult()
+    try:
+        result.update({"cta": "Buy", "ctaa": "Buy"})
+    except ValueError as error:
+        assert "ctaa" in str(error)
+    else:
+        raise AssertionError("unknown fields must be rejected")
+    assert result.to_dict() == {}
+
+def test_category_subset_has_no_defaults():
+    heuristics = analyze_document(PRODUCT_PAGE, ["cta_effectiveness"]).to_dict()
+    assert heuristics["cta"] == "Add to cart"
+    assert "testimonials" not in heuristics and "trust_indicators" not in heuristics and "page_weight_bytes" not in heuristics
+    # a stored subset re-scores the same as the typed result
+    assert calculate_conversion_scores(heuristics, ["cta_effectiveness"]) == heuristics["conversion_scores"]
+
+def test_rows_mark_unset_fields():
+    result = HeuristicsResult.from_dict({"title": "Truffles", "largest_assets": [1, 2], "trust_indicators": {"guarantees": 2}})
+    row = dict(zip(COLUMNS, result.to_row()))
+    assert row["title"] == "Truffles" and row["largest_assets"] == 2 and row["trust_indicators.guarantees"] == 2
+    assert row["testimonials"] is None and row["conversion_scores.overall_score"] is None
+    assert to_columns([result, HeuristicsResult()])["title"] == ["Truffles", None]
+
+def test_footprint():
+    # the point of the typed result is holding many of them; it must stay well under the dict it replaces
+    data = analyze_document(PRODUCT_PAGE).to_dict()
+
+    def bytes_per_item(make, count=10000):
+        tracemalloc.start()
+        items = [make() for _ in range(count)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / len(items)
+
+    typed = bytes_per_item(lambda: HeuristicsResult.from_dict(data))
+    plain = bytes_per_item(lambda: dict(data))
+    print("Bytes per result:", round(typed), "vs dict", round(plain))
+    assert typed < plain / 2
+
+if __name__ == "__main__":
+    test_only_assigned_fields_are_emitted()
+    test_unknown_update_keys()
+    test_category_subset_has_no_defaults()
+    test_rows_mark_unset_fields()
+    test_footprint()
+    print("Heuristics result works")
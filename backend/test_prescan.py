@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from heuristic import analyze_document
+from prescan import QUICK_CATEGORIES, PreScanner, check_mode, prescan_document, quick_audit
+
+PRODUCT_PAGE = """<html><head><title>Assorted Chocolate Truffle Box | Socola</title>
+<meta name="viewport" content="width=device-width"><meta name="description" content="Truffles">
+<meta property="og:title" content="Truffle Box"><link rel="canonical" href="/p">
+<script type="application/ld+json">{"@type":"Product","name":"Truffle Box","offers":{"price":"49.00"}}</script>
+<script src="x.js"></script></head><body><nav class="breadcrumb">Home</nav><main>
+<h1>Assorted Chocolate Truffle Box</h1><span class="price">$49.00</span><p>Free shipping on orders</p>
+<form><button type="submit">Add to cart</button></form><div class="reviews">"Absolutely the best truffles"</div>
+<input type="search"></main><a href="/shop">Shop now</a></body></html>"""
+
+SAAS_PAGE = """<html><head><title>Acme Cloud - the platform for teams</title></head><body>
+<header><a href="/login">Login</a><a href="/signup">Sign up</a></header>
+<h1>Welcome to Acme</h1><p>About us. Our story, our mission and team. Featured news and blog. Contact support.</p>
+<p>Get started with a free trial. Pricing from $29 per month subscription with API integration.</p>
+<script>window.acme = {};</script><button>Get started</button></body></html>"""
+
+SHARED_FIELDS = ["site_type", "page_type", "title", "viewport_present", "meta_title_len", "meta_description_len",
+                 "og_tags_present", "canonical_present", "html_bytes", "external_script_count", "inline_script_count"]
+
+def test_matches_full_analyzer():
+    for html in (PRODUCT_PAGE, SAAS_PAGE):
+        full = analyze_document(html).to_dict()
+        quick = prescan_document(html).to_dict()
+        print("Prescan:", {name: quick[name] for name in ("site_type", "page_type", "html_bytes")})
+        assert {name: quick[name] for name in SHARED_FIELDS} == {name: full[name] for name in SHARED_FIELDS}
+
+def test_chunk_boundaries():
+    # keywords, tags and multibyte text split across chunks give the same result as one feed
+    html = PRODUCT_PAGE.replace("Truffles", "Truffles café")
+    scanner = PreScanner()
+    for start in range(0, len(html), 7):
+        scanner.feed_text(html[start:start + 7])
+    scanner.close()
+    assert scanner.to_result().to_dict() == prescan_document(html).to_dict()
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PRODUCT_PAGE.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_quick_audit_streams_a_page():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        result = quick_audit(f"http://127.0.0.1:{server.server_port}/products/truffles")
+    finally:
+        server.shutdown()
+    full = analyze_document(PRODUCT_PAGE, QUICK_CATEGORIES).to_dict()
+    print("Quick audit:", result["conversion_scores"], result["scan_ms"])
+    assert result["mode"] == "quick" and result["scan_ms"] > 0
+    assert result["conversion_scores"] == full["conversion_scores"]
+
+def test_check_mode():
+    check_mode("full", ["cta_effectiveness"])
+    check_mode("quick", QUICK_CATEGORIES)
+    check_mode("quick")
+    for mode, categories, message in [("fast", None, "unknown mode: fast"),
+                                      ("quick", ["technical_performance", "cta_effectiveness"], "cannot score: cta_effectiveness")]:
+        try:
+            check_mode(mode, categories)
+        except ValueError as error:
+            assert message in str(error), error
+        else:
+            raise AssertionError(f"{mode} {categories} must be rejected")
+
+if __name__ == "__main__":
+    test_matches_full_analyzer()
+    test_chunk_boundaries()
+    test_quick_audit_streams_a_page()
+    test_check_mode()
+    print("Prescan works")
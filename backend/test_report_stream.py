@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import json
+
+from report_stream import ReportStreamParser
+
+def test_incremental_report():
+    report = {
+        "summary": "Price \"hidden\" below the fold, {weak} CTA.",
+        "top_issues": ["no price near cta", "cta below fold [mobile]"],
+        "quick_wins": ["add shipping note"],
+        "prioritized_actions": [
+            {"action": "Move price next to CTA", "why": "price_near_cta=false", "impact": 3, "confidence": 2, "effort": 1},
+            {"action": "Bad item", "why": "cta_effectiveness=3", "impact": 7, "confidence": 1, "effort": 1}
+        ]
+    }
+    text = json.dumps(report, indent=2)
+
+    parser = ReportStreamParser()
+    events = []
+    for start in range(0, len(text), 5):
+        events += [(start, event) for event in parser.feed(text[start:start + 5])]
+
+    for start, event in events:
+        print(f"{start:>4} {event['event']}: {event['data']}")
+
+    names = [event["event"] for _, event in events]
+    assert names == ["summary", "top_issues", "quick_wins", "prioritized_action", "invalid"]
+    assert events[0][1]["data"] == report["summary"]
+    assert events[0][0] < len(text) // 4
+    assert parser.result() == report
+
+if __name__ == "__main__":
+    test_incremental_report()
+    print("Incremental report parsing works")
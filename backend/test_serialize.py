@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import json
+
+import serialize
+from serialize import parse_report, project, project_result, render
+
+RESULT = {
+    "url": "https://example.com/p",
+    "llm_report": {"summary": "ok"},
+    "heuristics": {"cta": "Add to cart", "conversion_scores": {"cta_effectiveness": 8, "overall_score": 7.1},
+                   "trust_indicators": {"guarantees": 2, "client_logos": 0}}
+}
+
+def test_parse_report():
+    assert parse_report('{"summary": "ok"}') == {"summary": "ok"}
+    assert parse_report("not json") == "not json"
+    assert parse_report({"error": "boom"}) == {"error": "boom"} and parse_report(None) is None
+
+def test_projection():
+    heuristics = RESULT["heuristics"]
+    assert project(heuristics, ["trust_indicators.guarantees", "cta", "missing.path", "cta.nested"]) == {
+        "trust_indicators": {"guarantees": 2}, "cta": "Add to cart"}
+    assert project_result(RESULT, None) is RESULT
+    assert project_result(RESULT, " url , conversion_scores.overall_score,") == {
+        "url": "https://example.com/p", "heuristics": {"conversion_scores": {"overall_score": 7.1}}}
+    assert project_result({"error": "boom"}, "error,cta") == {"error": "boom"}
+
+def test_negotiation():
+    response = render(RESULT)
+    assert response.media_type == "application/json" and json.loads(response.body) == RESULT
+    assert render(RESULT, accept="application/json", format="json").media_type == "application/json"
+    # non-string keys still encode
+    assert json.loads(render({1: "a"}).body) == {"1": "a"}
+
+    bad = render(RESULT, accept="application/msgpack", format="yaml")
+    assert bad.status_code == 400 and "unknown format: yaml" in json.loads(bad.body)["error"]
+
+    installed = serialize.msgpack
+    try:
+        serialize.msgpack = None
+        for options in ({"format": "msgpack"}, {"accept": "text/html, application/x-msgpack"}):
+            missing = render(RESULT, **options)
+            assert missing.status_code == 406 and missing.media_type == "application/json"
+        # an explicit format= wins over the accept header
+        assert render(RESULT, accept="application/msgpack", format="json").status_code == 200
+    finally:
+        serialize.msgpack = installed
+
+    if installed:
+        packed = render(RESULT, status_code=201, format="msgpack")
+        assert packed.status_code == 201 and packed.media_type == "application/msgpack"
+        assert installed.unpackb(packed.body) == RESULT
+    else:
+        print("msgpack not installed; encoding check skipped")
+
+if __name__ == "__main__":
+    test_parse_report()
+    test_projection()
+    test_negotiation()
+    print("Serialization works")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import asyncio
+import gc
+
+from singleflight import SingleFlight
+
+def test_single_flight():
+    async def run():
+        inflight = SingleFlight()
+        calls = []
+
+        async def audit():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"score": 7}
+
+        results = await asyncio.gather(*[inflight.do("https://shop.test/p", audit) for _ in range(5)])
+        assert results == [{"score": 7}] * 5 and len(calls) == 1
+        assert inflight.stats() == {"in_flight": 0, "started": 1, "shared": 4}
+
+        # one caller going away does not cancel the work the others share
+        first = asyncio.create_task(inflight.do("https://shop.test/q", audit))
+        second = asyncio.create_task(inflight.do("https://shop.test/q", audit))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == {"score": 7}
+
+        # errors reach every waiter, and are retrieved even when every waiter is gone
+        async def broken():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("fetch failed")
+
+        unhandled = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        waiters = [asyncio.create_task(inflight.do("https://shop.test/r", broken)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.sleep(0.05)
+        gc.collect()
+        await asyncio.sleep(0)
+        assert not unhandled, unhandled
+        try:
+            await inflight.do("https://shop.test/s", broken)
+        except RuntimeError as error:
+            assert str(error) == "fetch failed"
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_single_flight()
+    print("Single-flight works")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+from bs4 import BeautifulSoup
+
+from heuristic import _parse_price, analyze_document, extract_structured_data, structured_pricing_info
+
+JSONLD_PAGE = """<html><head><script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebPage", "name": "Truffles"},
+  {"@type": "Product", "name": "Truffle Box", "image": ["/a.jpg", {"url": "/b.jpg"}],
+   "offers": {"@type": "Offer", "price": "1.234,56", "priceCurrency": "EUR",
+              "availability": "https://schema.org/InStock"},
+   "aggregateRating": {"ratingValue": "4.7", "reviewCount": "120"},
+   "review": [{"@type": "Review"}, {"@type": "Review"}]}
+]}</script></head><body></body></html>"""
+
+MICRODATA_PAGE = """<html><body><div itemscope itemtype="https://schema.org/Product">
+<h1 itemprop="name">Cocoa Nibs</h1><img itemprop="image" src="/nibs.jpg">
+<div itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+<span itemprop="price" content="12.50">$12.50</span><meta itemprop="priceCurrency" content="USD">
+<link itemprop="availability" href="https://schema.org/OutOfStock"></div>
+<div itemprop="aggregateRating" itemscope><span itemprop="ratingValue">4.2</span>
+<span itemprop="reviewCount">31</span></div></div></body></html>"""
+
+META_PAGE = """<html><head><meta property="og:title" content="Gift Card">
+<meta property="product:price:amount" content="25,00"><meta property="product:price:currency" content="GBP">
+<meta property="product:availability" content="in stock"></head><body></body></html>"""
+
+def test_prices():
+    cases = {"1.234,56": 1234.56, "1,234.56": 1234.56, "€ 12,50": 12.5, "1,234": 1234.0,
+             "1.234.567": 1234567.0, "$49.00": 49.0, 19: 19.0, "free": None, None: None}
+    for value, expected in cases.items():
+        assert _parse_price(value) == expected, (value, _parse_price(value))
+
+def test_jsonld():
+    soup = BeautifulSoup(JSONLD_PAGE, "html.parser")
+    found = extract_structured_data(soup)
+    print("JSON-LD:", found)
+    assert found["name"] == "Truffle Box" and found["price"] == 1234.56 and found["currency"] == "EUR"
+    assert found["availability"] == "InStock" and found["images"] == ["/a.jpg", "/b.jpg"]
+    assert found["rating"] == 4.7 and found["review_count"] == 120 and found["review_items"] == 2
+    assert found["sources"] == ["json-ld"]
+    assert structured_pricing_info(found, soup) == {"price": "€1,234.56", "is_free_product": False}
+
+def test_microdata():
+    found = extract_structured_data(BeautifulSoup(MICRODATA_PAGE, "html.parser"))
+    print("Microdata:", found)
+    assert found["name"] == "Cocoa Nibs" and found["price"] == 12.5 and found["currency"] == "USD"
+    assert found["availability"] == "OutOfStock" and found["images"] == ["/nibs.jpg"]
+    assert found["rating"] == 4.2 and found["review_count"] == 31
+    assert found["sources"] == ["microdata"]
+
+def test_meta_tags():
+    soup = BeautifulSoup(META_PAGE, "html.parser")
+    found = extract_structured_data(soup)
+    print("Meta:", found)
+    assert found["price"] == 25.0 and found["currency"] == "GBP" and found["availability"] == "in stock"
+    assert found["sources"] == ["meta"]
+    assert structured_pricing_info(found, soup)["price"] == "£25.00"
+
+def test_no_structured_data():
+    soup = BeautifulSoup("<html><body><p>$5</p></body></html>", "html.parser")
+    found = extract_structured_data(soup)
+    assert found["sources"] == [] and structured_pricing_info(found, soup) is None
+
+def test_price_without_currency():
+    # the symbol comes from the page; with none next to the amount, the page scan's text is kept
+    page = """<html><head><script type="application/ld+json">{{"@type": "Product", "name": "Truffle Box",
+    "offers": {{"price": "{price}"}}}}</script></head><body><h1>Truffle Box</h1>{body}</body></html>"""
+    assert analyze_document(page.format(price="49.00", body="<p>Now $49.99, was <b>£ 49</b></p>")).price == "£49.00"
+    assert analyze_document(page.format(price="49.00", body='<span class="price">49.00 dollars</span>')).price == "49.00 dollars"
+
+def test_zero_price_is_not_free():
+    # a 0 offer price usually means variant pricing; free needs free wording on the page
+    page = """<html><head><script type="application/ld+json">{{"@type": "Product", "name": "Truffle Box",
+    "offers": {{"price": "0", "priceCurrency": "USD"}}}}</script></head><body>{body}</body></html>"""
+    variants = analyze_document(page.format(body='<p class="price">From $19.00</p>'))
+    assert variants.price == "From $19.00" and not variants.is_free_product
+    assert analyze_document(page.format(body="<p>Free plan, no card needed</p>")).is_free_product
+
+if __name__ == "__main__":
+    test_prices()
+    test_jsonld()
+    test_microdata()
+    test_meta_tags()
+    test_no_structured_data()
+    test_price_without_currency()
+    test_zero_price_is_not_free()
+    print("Structured data extraction works")